@@ -0,0 +1,79 @@
+"""
+高级白名单插件核心逻辑
+不依赖 AstrBot 运行时，可被插件本体、基准测试和离线工具共同使用
+"""
+
+from .audit import BlockAuditLog
+from .bulk import ENTRY_SEPARATORS, format_entries, merge_entries, parse_entries
+from .cache import DecisionCache
+from .classify import (
+    KIND_FRIEND,
+    KIND_GROUP,
+    KIND_OTHER,
+    KIND_REQUEST,
+    KIND_TEMP,
+    EventDescriptor,
+    classify_event,
+    parse_origin,
+)
+from .expiry import ExpiryScheduler, format_expiry, parse_expiry
+from .feedback import FeedbackLimiter
+from .flood import FloodGuard
+from .idset import CompactIdSet
+from .index import WhitelistIndex, compile_whitelist
+from .listing import EntryView, paginate
+from .log import LazyLogger
+from .outbox import FeedbackOutbox
+from .metrics import FilterMetrics, LatencyHistogram, format_summary, render_prometheus
+from .journal import FeedbackJournal
+from .persist import DebouncedSaver
+from .policy import SWITCH_KEYS, PolicyPlan, TypePlan, compile_policy
+from .rules import RuleSet, is_rule
+from .store import LayeredIndex, SQLiteWhitelistStore
+from .watch import WATCHED_KEYS, ConfigWatcher, PlatformWatcher
+
+__all__ = [
+    "BlockAuditLog",
+    "ENTRY_SEPARATORS",
+    "format_entries",
+    "merge_entries",
+    "parse_entries",
+    "DecisionCache",
+    "DebouncedSaver",
+    "KIND_FRIEND",
+    "KIND_GROUP",
+    "KIND_OTHER",
+    "KIND_REQUEST",
+    "KIND_TEMP",
+    "EventDescriptor",
+    "classify_event",
+    "parse_origin",
+    "ExpiryScheduler",
+    "format_expiry",
+    "parse_expiry",
+    "FeedbackLimiter",
+    "FloodGuard",
+    "FeedbackJournal",
+    "FeedbackOutbox",
+    "EntryView",
+    "paginate",
+    "LazyLogger",
+    "FilterMetrics",
+    "LatencyHistogram",
+    "format_summary",
+    "render_prometheus",
+    "RuleSet",
+    "is_rule",
+    "LayeredIndex",
+    "SQLiteWhitelistStore",
+    "CompactIdSet",
+    "WhitelistIndex",
+    "compile_whitelist",
+    "WATCHED_KEYS",
+    "ConfigWatcher",
+    "PlatformWatcher",
+    "SWITCH_KEYS",
+    "PolicyPlan",
+    "TypePlan",
+    "compile_policy",
+]
@@ -0,0 +1,121 @@
+"""
+拦截日志汇总
+被阻止的消息只在内存中计数，由后台任务按周期汇总输出日志，并可写入 JSONL 文件
+"""
+
+import asyncio
+from datetime import datetime
+import json
+import os
+
+# 拦截类别 -> 日志中显示的名称和原因
+CATEGORY_LABELS = {
+    "temp": ("临时会话", "临时会话控制已启用"),
+    "friend": ("好友私聊", "不在白名单中"),
+    "group": ("群聊会话", "不在白名单中"),
+    "blacklist": ("会话", "命中黑名单"),
+}
+
+
+class BlockAuditLog:
+    """被阻止消息的汇总日志
+
+    record 只在字典中累加计数（O(1)），不做任何 IO；后台任务每隔 interval 秒取走当前计数，
+    按 (类别, 会话) 合并输出，如「群聊会话 X 在最近 60 秒内被阻止 312 次」。
+
+    参数:
+        logger: 输出汇总日志的 logger
+        interval: 汇总周期（秒），<= 0 时每次拦截立即输出一条日志
+        max_keys: 每个周期最多单独统计的会话数，超出部分只计入总数
+        max_lines: 每个周期最多输出的日志行数，其余会话合并为一行
+        jsonl_path: 可选，汇总记录以 JSONL 格式追加写入该文件
+    """
+
+    def __init__(self, logger, interval: float = 60, max_keys: int = 10000,
+                 max_lines: int = 20, jsonl_path=None):
+        self.logger = logger
+        self.interval = interval
+        self.max_keys = max_keys
+        self.max_lines = max_lines
+        self.jsonl_path = str(jsonl_path) if jsonl_path else None
+        self._counts = {}
+        # 超出 max_keys 未单独统计的拦截次数
+        self._overflow = 0
+        self._task = None
+
+    def record(self, category: str, origin: str):
+        """记录一次拦截"""
+        if self.interval <= 0:
+            label, reason = CATEGORY_LABELS.get(category, (category, ""))
+            self.logger.info(f"{label} {origin} 已阻止（{reason}）")
+            return
+        key = (category, origin)
+        counts = self._counts
+        count = counts.get(key)
+        if count is not None:
+            counts[key] = count + 1
+        elif len(counts) < self.max_keys:
+            counts[key] = 1
+        else:
+            self._overflow += 1
+        if self._task is None:
+            self._start()
+
+    def _start(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        """取走当前周期的计数并输出汇总"""
+        if not self._counts and not self._overflow:
+            return
+        counts, self._counts = self._counts, {}
+        overflow, self._overflow = self._overflow, 0
+        items = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+        interval = int(self.interval)
+        for (category, origin), count in items[:self.max_lines]:
+            label, reason = CATEGORY_LABELS.get(category, (category, ""))
+            self.logger.info(f"{label} {origin} 在最近 {interval} 秒内被阻止 {count} 次（{reason}）")
+        rest = items[self.max_lines:]
+        if rest or overflow:
+            rest_total = sum(count for _, count in rest) + overflow
+            self.logger.info(f"另有 {len(rest)} 个会话在最近 {interval} 秒内共被阻止 {rest_total} 次"
+                             + (f"（其中 {overflow} 次超出统计上限）" if overflow else ""))
+        if self.jsonl_path:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_jsonl, items, overflow)
+            except Exception as e:
+                self.logger.warning(f"写入拦截日志文件失败: {e}")
+
+    def _write_jsonl(self, items: list, overflow: int):
+        now = datetime.now().isoformat(timespec="seconds")
+        lines = [
+            json.dumps({"time": now, "interval": self.interval, "category": category,
+                        "origin": origin, "count": count}, ensure_ascii=False) + "\n"
+            for (category, origin), count in items
+        ]
+        if overflow:
+            lines.append(json.dumps({"time": now, "interval": self.interval, "category": None,
+                                     "origin": None, "count": overflow}) + "\n")
+        os.makedirs(os.path.dirname(self.jsonl_path) or ".", exist_ok=True)
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def close(self):
+        """停止后台任务并输出剩余汇总"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
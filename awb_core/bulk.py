@@ -0,0 +1,73 @@
+"""
+白名单批量导入导出
+使用集合去重，整批合并后只需一次写入
+"""
+
+import io
+import itertools
+import re
+
+from .rules import is_rule
+
+# 条目分隔符：空白、半角/全角逗号和分号
+ENTRY_SEPARATORS = re.compile(r"[\s,;，；]+")
+
+
+def parse_entries(text: str, csv_first_column: bool = False) -> list:
+    """解析换行/逗号分隔的条目，去除空白和重复项，保持首次出现的顺序
+
+    以 # 开头的行视为注释。以 range:/prefix:/glob:/re: 开头的行整行作为一条规则，不按分隔符拆分
+    （正则和通配符中可能含有逗号、分号或空格）。csv_first_column 为 True 时按 CSV 解析，只取每行第一列，
+    并跳过不含数字的表头行
+    """
+    entries = []
+    seen = set()
+    if csv_first_column:
+        # csv 只在导入 .csv 文件时使用，延迟导入以缩短插件加载时间
+        import csv
+        rows = (row[0] for row in csv.reader(io.StringIO(text)) if row and not row[0].lstrip().startswith("#"))
+        items = (cell.strip() for cell in rows)
+        first = next(items, None)
+        if first is not None and any(ch.isdigit() for ch in first):
+            items = itertools.chain((first,), items)
+    else:
+        items = (
+            item.strip().strip('"').strip()
+            for line in text.splitlines()
+            if line.strip() and not line.lstrip().startswith("#")
+            for item in _split_line(line.strip())
+        )
+    for item in items:
+        if item and item not in seen:
+            seen.add(item)
+            entries.append(item)
+    return entries
+
+
+def _split_line(line: str) -> list:
+    """拆分一行中的条目，规则行整行作为一条"""
+    if is_rule(line):
+        return [line]
+    return ENTRY_SEPARATORS.split(line)
+
+
+def merge_entries(existing: list, new_entries) -> tuple:
+    """将新条目合并到现有列表末尾，O(n) 去重
+
+    返回:
+        (合并后的新列表, 新增条目数)
+    """
+    seen = set(existing)
+    merged = list(existing)
+    added = 0
+    for item in new_entries:
+        if item not in seen:
+            seen.add(item)
+            merged.append(item)
+            added += 1
+    return merged, added
+
+
+def format_entries(entries) -> str:
+    """每行一个条目，用于导出"""
+    return "".join(f"{item}\n" for item in entries)
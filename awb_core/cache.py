@@ -0,0 +1,72 @@
+"""
+白名单判定缓存
+按会话缓存白名单命中结果，带 TTL 过期和 LRU 容量淘汰
+"""
+
+from collections import OrderedDict
+import time
+
+
+class DecisionCache:
+    """有界 LRU 判定缓存
+
+    参数:
+        maxsize: 最大条目数，<= 0 时禁用缓存
+        ttl: 条目存活秒数，<= 0 时禁用缓存
+    """
+
+    __slots__ = ("maxsize", "ttl", "hits", "misses", "_data", "_clock")
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300, clock=time.monotonic):
+        self.maxsize = max(int(maxsize or 0), 0)
+        self.ttl = float(ttl or 0)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._clock = clock
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key):
+        """获取缓存的判定结果，未命中或已过期时返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[1] < self._clock():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """写入判定结果，超出容量时淘汰最久未使用的条目"""
+        if not self.enabled:
+            return
+        data = self._data
+        data[key] = (value, self._clock() + self.ttl)
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def clear(self):
+        """清空缓存（白名单配置变更时调用），保留命中统计"""
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
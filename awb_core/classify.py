@@ -0,0 +1,148 @@
+"""
+事件分类
+每个事件只读取一次原始数据，提取为不可变的事件描述，供后续所有检查共用
+"""
+
+from functools import lru_cache
+import sys
+
+from .policy import FRIEND_MESSAGE, GROUP_MESSAGE, OTHER_MESSAGE
+
+# 事件种类
+KIND_REQUEST = "request"  # 请求事件（好友申请、群聊邀请等）
+KIND_TEMP = "temp"  # 临时会话
+KIND_FRIEND = "friend"  # 好友私聊
+KIND_GROUP = "group"  # 群聊
+KIND_OTHER = "other"  # 未知消息类型
+
+# 解析结果缓存的容量：少量活跃会话占据绝大部分流量
+ORIGIN_CACHE_SIZE = 4096
+
+# 会话隔离（unique_session）开启时，群聊会话ID由发送者ID和群ID拼接而成的分隔符，
+# 如 aiocqhttp / slack 的 "用户_群"、lark 的 "用户%群"、misskey 的 "群_用户"
+_UNIQUE_SESSION_SEPARATORS = ("_", "%")
+
+_NO_ORIGIN = (None, None, None)
+
+_setattr = object.__setattr__
+
+
+class EventDescriptor:
+    """不可变的事件描述
+
+    属性:
+        kind: 事件种类（KIND_*）
+        message_type: 消息类型取值（FriendMessage / GroupMessage / OtherMessage）
+        is_request: 是否为请求事件
+        is_temp: 是否为临时会话
+        timestamp: 消息时间戳，无法获取时为 None
+        origin: unified_msg_origin
+        sender_id: 发送者ID
+        group_id: 群ID
+        platform_id / origin_type / session_id: 由 parse_origin 从 unified_msg_origin 解析出的三段，无法解析时为 None
+    """
+
+    __slots__ = (
+        "kind", "message_type", "is_request", "is_temp", "timestamp",
+        "origin", "sender_id", "group_id", "platform_id", "origin_type", "session_id",
+    )
+
+    def __init__(self, kind, message_type, is_request, is_temp, timestamp,
+                 origin, sender_id, group_id, platform_id, origin_type, session_id):
+        _setattr(self, "kind", kind)
+        _setattr(self, "message_type", message_type)
+        _setattr(self, "is_request", is_request)
+        _setattr(self, "is_temp", is_temp)
+        _setattr(self, "timestamp", timestamp)
+        _setattr(self, "origin", origin)
+        _setattr(self, "sender_id", sender_id)
+        _setattr(self, "group_id", group_id)
+        _setattr(self, "platform_id", platform_id)
+        _setattr(self, "origin_type", origin_type)
+        _setattr(self, "session_id", session_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("EventDescriptor 是不可变对象")
+
+    def __delattr__(self, name):
+        raise AttributeError("EventDescriptor 是不可变对象")
+
+    def __repr__(self) -> str:
+        return (f"EventDescriptor(kind={self.kind!r}, origin={self.origin!r}, "
+                f"sender_id={self.sender_id!r}, group_id={self.group_id!r}, timestamp={self.timestamp!r})")
+
+
+def _normalize_id(value):
+    if not value:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+@lru_cache(maxsize=ORIGIN_CACHE_SIZE)
+def parse_origin(origin: str, group_id: str = None) -> tuple:
+    """解析 unified_msg_origin，返回驻留的 (platform_id, message_type, session_id) 元组
+
+    与 AstrBot 的 MessageSession.from_str 相同，只切分前两个 ":"。
+    结果按 LRU 缓存，同一会话的后续事件直接复用同一个元组，无法解析时返回 (None, None, None)。
+
+    会话隔离开启时群聊的会话ID形如 "用户_群"，传入 group_id 时将其还原为群ID，
+    使群聊白名单按群匹配，而不会因为拼接的会话ID而失配
+    """
+    if not origin:
+        return _NO_ORIGIN
+    parts = origin.split(":", 2)
+    if len(parts) != 3:
+        return _NO_ORIGIN
+    platform_id, message_type, session_id = parts
+    if (group_id and message_type == GROUP_MESSAGE and session_id != group_id
+            and len(session_id) > len(group_id)):
+        if ((session_id.endswith(group_id) and session_id[-len(group_id) - 1] in _UNIQUE_SESSION_SEPARATORS)
+                or (session_id.startswith(group_id) and session_id[len(group_id)] in _UNIQUE_SESSION_SEPARATORS)):
+            session_id = group_id
+    return (sys.intern(platform_id), sys.intern(message_type), sys.intern(session_id))
+
+
+def classify_event(message_type: str, platform_name: str, origin: str, sender_id=None,
+                   group_id=None, raw_message=None, timestamp=None) -> EventDescriptor:
+    """对事件进行一次性分类
+
+    - 请求事件：raw_message 中的 post_type 为 "request"
+    - 临时会话（排除请求事件）：
+        1. 消息类型为 OtherMessage
+        2. QQ 平台（aiocqhttp）的 FriendMessage，raw_message 中 message_type 为 "private"
+           且 sub_type 存在且不是 "friend"
+    """
+    raw = raw_message if isinstance(raw_message, dict) else None
+    is_request = raw is not None and raw.get("post_type", "") == "request"
+
+    is_temp = False
+    if not is_request:
+        if message_type == OTHER_MESSAGE:
+            is_temp = True
+        elif message_type == FRIEND_MESSAGE and platform_name == "aiocqhttp" and raw is not None:
+            sub_type = raw.get("sub_type", "")
+            if raw.get("message_type", "") == "private" and sub_type and sub_type != "friend":
+                is_temp = True
+
+    if timestamp is None and raw is not None:
+        timestamp = raw.get("time")
+
+    if is_request:
+        kind = KIND_REQUEST
+    elif is_temp:
+        kind = KIND_TEMP
+    elif message_type == FRIEND_MESSAGE:
+        kind = KIND_FRIEND
+    elif message_type == GROUP_MESSAGE:
+        kind = KIND_GROUP
+    else:
+        kind = KIND_OTHER
+
+    group_id = _normalize_id(group_id)
+    platform_id, origin_type, session_id = parse_origin(origin, group_id)
+
+    return EventDescriptor(
+        kind, message_type, is_request, is_temp, timestamp, origin,
+        _normalize_id(sender_id), group_id, platform_id, origin_type, session_id,
+    )
@@ -0,0 +1,200 @@
+"""
+限时名单条目
+记录条目的到期时间，由后台任务在到期时批量移除。到期时间只由调度器维护，
+索引和匹配路径中没有任何时间戳检查
+"""
+
+import asyncio
+from datetime import datetime
+import heapq
+import json
+import os
+import re
+import time
+
+# 时长单位 -> 秒
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+
+# 后台任务单次最长休眠时间（秒），墙上时钟被调整后最多延迟这么久才按新时间移除
+_MAX_SLEEP = 3600.0
+
+
+def parse_expiry(text: str, now: float = None) -> float:
+    """将有效期解析为到期的 Unix 时间戳
+
+    支持时长（如 "30m"、"2h"、"1d12h"，单位 s/m/h/d/w）和本地时间的 ISO 日期/时间
+    （如 "2026-12-31"、"2026-12-31T18:00"）。格式错误或已过期时抛出 ValueError
+    """
+    now = time.time() if now is None else now
+    text = text.strip().lower()
+    if text and not _DURATION_PATTERN.sub("", text):
+        seconds = sum(float(value) * DURATION_UNITS[unit] for value, unit in _DURATION_PATTERN.findall(text))
+        if seconds <= 0:
+            raise ValueError(f"有效期必须大于 0: {text}")
+        return now + seconds
+    try:
+        expires_at = datetime.fromisoformat(text.upper()).timestamp()
+    except ValueError:
+        raise ValueError(f"无法识别的有效期: {text}（示例: 30m、2h、7d、2026-12-31T18:00）") from None
+    if expires_at <= now:
+        raise ValueError(f"到期时间已过: {text}")
+    return expires_at
+
+
+def format_expiry(expires_at: float) -> str:
+    """到期时间的显示格式（本地时间，精确到分钟）"""
+    return datetime.fromtimestamp(expires_at).strftime("%Y-%m-%d %H:%M")
+
+
+class ExpiryScheduler:
+    """限时条目的到期调度器
+
+    到期时间保存在 expires 字典中，另用最小堆按到期时间排序。后台任务只休眠到堆顶条目到期
+    （再加 batch_window 秒，使相近时间到期的条目合并为一批），然后一次取出所有已到期的条目，
+    调用 on_expire({配置键: [条目, ...]})。
+
+    条目被取消或改期时不从堆中删除，出堆时与 expires 中的当前值比对，不一致的直接丢弃。
+
+    参数:
+        path: 到期时间持久化文件（JSON），None 时不持久化
+        on_expire: 一批条目到期时调用的函数
+        batch_window: 合并窗口（秒），条目最多延迟这么久移除
+        clock: 返回当前 Unix 时间的函数
+    """
+
+    def __init__(self, path=None, on_expire=None, batch_window: float = 1.0, clock=time.time):
+        self.path = str(path) if path else None
+        self.on_expire = on_expire
+        self.batch_window = max(float(batch_window or 0), 0.0)
+        self.clock = clock
+        # (配置键, 条目) -> 到期时间
+        self.expires = {}
+        self._heap = []
+        self._task = None
+        self._wakeup = None
+
+    def __len__(self) -> int:
+        return len(self.expires)
+
+    def load(self) -> int:
+        """读取持久化的到期时间，返回读取的条目数（文件不存在时为 0）"""
+        if not self.path:
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        for config_key, entries in data.items():
+            for entry, expires_at in entries.items():
+                self.expires[(config_key, entry)] = float(expires_at)
+        self._heap = [(expires_at, key) for key, expires_at in self.expires.items()]
+        heapq.heapify(self._heap)
+        return len(self.expires)
+
+    def save(self):
+        """将到期时间写入文件（先写临时文件再替换）"""
+        if not self.path:
+            return
+        data = {}
+        # list() 一次性复制，线程池中保存时事件循环继续修改 expires 也不会出错
+        for (config_key, entry), expires_at in list(self.expires.items()):
+            data.setdefault(config_key, {})[entry] = expires_at
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, config_key: str, entry: str):
+        """条目的到期时间，不是限时条目时返回 None"""
+        return self.expires.get((config_key, entry))
+
+    def schedule(self, config_key: str, entry: str, expires_at: float):
+        """设置（或修改）条目的到期时间"""
+        key = (config_key, entry)
+        self.expires[key] = expires_at
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (expires_at, key))
+        if self._task is None:
+            self.start()
+        elif earliest is None or expires_at < earliest:
+            # 新条目比当前等待的更早到期，唤醒后台任务重新计算休眠时间
+            self._wakeup.set()
+
+    def cancel(self, config_key: str, entry: str) -> bool:
+        """取消条目的到期时间（条目被手动删除或改为永久时调用）"""
+        return self.expires.pop((config_key, entry), None) is not None
+
+    def prune(self, get_entries) -> int:
+        """丢弃条目已不在名单中的到期时间，返回丢弃的条目数
+
+        get_entries(配置键) 返回该名单当前的条目，每个名单只读取一次
+        """
+        present = {}
+        stale = []
+        for key in self.expires:
+            config_key, entry = key
+            entries = present.get(config_key)
+            if entries is None:
+                entries = present[config_key] = set(get_entries(config_key))
+            if entry not in entries:
+                stale.append(key)
+        for key in stale:
+            del self.expires[key]
+        return len(stale)
+
+    def pop_due(self, now: float = None) -> dict:
+        """取出所有已到期的条目，返回 {配置键: [条目, ...]}"""
+        now = self.clock() if now is None else now
+        heap = self._heap
+        expires = self.expires
+        due = {}
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            if expires.get(key) != expires_at:
+                continue
+            del expires[key]
+            due.setdefault(key[0], []).append(key[1])
+        return due
+
+    def start(self):
+        """启动后台任务（没有运行中的事件循环时不启动，下次 schedule 时重试）"""
+        if self._task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        heap = self._heap
+        while True:
+            # 丢弃已取消或改期的堆顶条目
+            while heap and self.expires.get(heap[0][1]) != heap[0][0]:
+                heapq.heappop(heap)
+            delay = heap[0][0] - self.clock() if heap else _MAX_SLEEP
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay + self.batch_window, _MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due = self.pop_due()
+            if due and self.on_expire is not None:
+                self.on_expire(due)
+
+    async def close(self):
+        """停止后台任务"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
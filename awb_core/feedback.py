@@ -0,0 +1,79 @@
+"""
+反馈频率控制
+记录每天已发送过反馈的会话，按天整体过期并限制最大条目数
+"""
+
+from datetime import date, datetime, time as dt_time, timedelta
+import sys
+import time
+
+
+def _next_midnight(day: date) -> float:
+    """返回 day 次日零点（本地时间）的时间戳"""
+    return datetime.combine(day + timedelta(days=1), dt_time.min).timestamp()
+
+
+class FeedbackLimiter:
+    """每天每个会话最多反馈一次的频率控制器
+
+    只保存当天的记录：跨天时整体替换为新的集合，旧的一天在 O(1) 内整批丢弃，
+    不需要逐条清理。会话 key 经过 sys.intern 驻留，重复会话不会产生重复字符串。
+
+    参数:
+        maxsize: 每天最多记录的会话数。达到上限后，当天新出现的会话不再发送反馈
+            （静默阻止），避免刷屏时内存和外发消息无限增长。<= 0 表示不限制
+    """
+
+    __slots__ = ("maxsize", "suppressed", "_day", "_day_end", "_sent", "_clock")
+
+    def __init__(self, maxsize: int = 10000, clock=time.time):
+        self.maxsize = max(int(maxsize or 0), 0)
+        # 当天因达到容量上限而未发送反馈的次数
+        self.suppressed = 0
+        self._clock = clock
+        self._day = None
+        self._day_end = 0.0
+        self._sent = set()
+
+    @property
+    def day(self) -> date:
+        self._rotate()
+        return self._day
+
+    def __len__(self) -> int:
+        self._rotate()
+        return len(self._sent)
+
+    def __contains__(self, key) -> bool:
+        self._rotate()
+        return key in self._sent
+
+    def _rotate(self):
+        """跨天时丢弃前一天的全部记录"""
+        now = self._clock()
+        if now < self._day_end:
+            return
+        today = date.fromtimestamp(now)
+        self._day = today
+        self._day_end = _next_midnight(today)
+        self._sent = set()
+        self.suppressed = 0
+
+    def should_send(self, key: str) -> bool:
+        """今天是否还未向该会话发送过反馈，且未达到容量上限"""
+        self._rotate()
+        if key in self._sent:
+            return False
+        if self.maxsize and len(self._sent) >= self.maxsize:
+            self.suppressed += 1
+            return False
+        return True
+
+    def mark_sent(self, key: str):
+        """记录今天已向该会话发送反馈"""
+        self._rotate()
+        self._sent.add(sys.intern(key))
+
+    def clear(self):
+        self._sent = set()
+        self._day_end = 0.0
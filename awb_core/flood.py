@@ -0,0 +1,86 @@
+"""
+刷屏保护
+同一会话中的同一发送者在时间窗口内被阻止达到阈值后，窗口结束前的后续消息只做一次字典查找即直接丢弃，
+不再进行分类、白名单匹配和反馈检查
+"""
+
+import time
+
+
+class FloodGuard:
+    """按 (会话, 发送者) 计数的固定窗口限流器
+
+    - record_block: 消息被阻止后调用，窗口内第一次被阻止时开始计时，达到 threshold 次后进入丢弃状态直到窗口结束
+    - should_drop: 事件进入过滤逻辑前调用，只做一次字典查找（命中时再读取一次时钟）
+    - 计数表和丢弃表的条目数都不超过 maxsize，满时淘汰最早加入的条目
+
+    属性:
+        shed: 累计直接丢弃的事件数
+    """
+
+    __slots__ = ("threshold", "window", "maxsize", "clock", "shed", "_counters", "_shedding")
+
+    def __init__(self, threshold: int = 10, window: float = 60.0, maxsize: int = 10000, clock=time.monotonic):
+        self.threshold = max(int(threshold or 0), 0)
+        self.window = max(float(window or 0), 0.0)
+        self.maxsize = max(int(maxsize or 0), 1)
+        self.clock = clock
+        self.shed = 0
+        # key -> [窗口内被阻止次数, 窗口结束时间]
+        self._counters = {}
+        # key -> 丢弃状态结束时间
+        self._shedding = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0 and self.window > 0
+
+    def __bool__(self) -> bool:
+        """是否存在处于丢弃状态的会话（没有时调用方可跳过 should_drop）"""
+        return bool(self._shedding)
+
+    def should_drop(self, key) -> bool:
+        """该会话是否处于丢弃状态，是则计入 shed"""
+        until = self._shedding.get(key)
+        if until is None:
+            return False
+        if self.clock() < until:
+            self.shed += 1
+            return True
+        del self._shedding[key]
+        return False
+
+    def record_block(self, key) -> bool:
+        """记录一次阻止，返回该会话是否因此进入丢弃状态"""
+        if not self.enabled:
+            return False
+        now = self.clock()
+        counters = self._counters
+        counter = counters.get(key)
+        if counter is None or now >= counter[1]:
+            if counter is not None:
+                del counters[key]
+            elif len(counters) >= self.maxsize:
+                del counters[next(iter(counters))]
+            counter = counters[key] = [0, now + self.window]
+        counter[0] += 1
+        if counter[0] < self.threshold:
+            return False
+        del counters[key]
+        shedding = self._shedding
+        if key not in shedding and len(shedding) >= self.maxsize:
+            del shedding[next(iter(shedding))]
+        shedding[key] = counter[1]
+        return True
+
+    def clear(self):
+        """清空所有计数和丢弃状态（白名单变更后调用，避免刚加入白名单的会话仍被丢弃）"""
+        self._counters.clear()
+        self._shedding.clear()
+
+    def stats(self) -> dict:
+        return {
+            "shed": self.shed,
+            "tracking": len(self._counters),
+            "shedding": len(self._shedding),
+        }
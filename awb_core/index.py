@@ -0,0 +1,153 @@
+"""
+白名单预编译索引
+将配置中的白名单列表一次性按平台编译为集合，匹配时只做常数次集合查找
+"""
+
+from .classify import parse_origin
+from .idset import CompactIdSet, set_memory_usage
+from .policy import FRIEND_MESSAGE, GROUP_MESSAGE
+from .rules import RuleSet, is_rule
+
+# 纯ID数量达到该值时改用紧凑的整数数组存储（每个ID约 8 字节，但查找比集合慢约 30 倍），0 表示不启用。
+# 默认不启用，只在内存紧张的超大名单上由 compact_id_threshold 配置开启
+COMPACT_THRESHOLD = 0
+
+
+def _compact(ids: set, compact_threshold: int):
+    return CompactIdSet(ids) if len(ids) >= compact_threshold > 0 else frozenset(ids)
+
+
+class WhitelistIndex:
+    """编译后的白名单索引
+
+    属性:
+        full: 带 ":" 的条目原文（去除首尾空格），用于精确匹配完整的 unified_msg_origin、用户ID、群ID
+        ids: 纯ID条目，只在已配置的平台上匹配用户ID、群ID 或会话ID。
+            启用紧凑存储（compact_threshold > 0）且数量达到该值时为 CompactIdSet，否则为 frozenset
+        scoped: platform:Type:id 格式条目按 (平台ID, 消息类型) 分组的ID集合，
+            只在对应平台上匹配：FriendMessage 条目匹配用户ID，GroupMessage 条目匹配群ID
+        pairs: 群号/QQ号 格式条目的 (群ID, 用户ID) 集合，只匹配该群中的该发送者（受平台限制）
+        platforms: 纯ID条目展开到的平台ID集合，为 None 时不限平台（未配置任何平台ID）
+        rules: range: / prefix: / glob: / re: 规则编译成的 RuleSet，没有规则时为 None。
+            只在精确匹配全部失败后才检查，不影响精确匹配的速度；range 规则与纯ID条目一样受平台限制
+        size: 有效条目数量（含规则）
+    """
+
+    __slots__ = ("full", "ids", "scoped", "pairs", "platforms", "rules", "size")
+
+    def __init__(self, items=(), platform_ids=None, compact_threshold: int = COMPACT_THRESHOLD):
+        full = set()
+        bare = set()
+        scoped = {}
+        pairs = set()
+        rules = []
+        for item in items:
+            item = str(item).strip()
+            if not item:
+                continue
+            if is_rule(item):
+                rules.append(item)
+            elif ":" in item:
+                full.add(item)
+                parts = item.split(":", 2)
+                if len(parts) == 3 and parts[2]:
+                    # 带前缀的格式（如 qq:FriendMessage:12345678），按平台和消息类型归类ID部分
+                    scoped.setdefault((parts[0], parts[1]), set()).add(parts[2])
+            elif "/" in item:
+                group_id, _, user_id = item.partition("/")
+                if group_id.strip() and user_id.strip():
+                    pairs.add((group_id.strip(), user_id.strip()))
+            else:
+                bare.add(item)
+        self.full = frozenset(full)
+        self.ids = _compact(bare, compact_threshold)
+        self.scoped = {key: _compact(ids, compact_threshold) for key, ids in scoped.items()}
+        self.pairs = frozenset(pairs)
+        self.platforms = frozenset(platform_ids) if platform_ids else None
+        self.rules = RuleSet(rules) if rules else None
+        self.size = len(full) + len(bare) + len(pairs) + (len(self.rules) if self.rules is not None else 0)
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def memory_usage(self) -> int:
+        """估算索引占用的内存字节数"""
+        return (set_memory_usage(self.full) + set_memory_usage(self.ids)
+                + sum(set_memory_usage(ids) for ids in self.scoped.values()) + set_memory_usage(self.pairs))
+
+    def allows_platform(self, platform_id: str) -> bool:
+        """纯ID条目是否适用于该平台"""
+        return self.platforms is None or platform_id is None or platform_id in self.platforms
+
+    def match(self, user_id: str = None, group_id: str = None,
+              unified_msg_origin: str = None, session_id: str = None, platform_id: str = None) -> bool:
+        """检查是否命中白名单
+
+        1. 带 ":" 的条目等于完整的 unified_msg_origin、用户ID 或群ID
+        2. 纯ID条目等于用户ID、群ID 或会话ID，且消息来自已配置的平台
+        3. platform:FriendMessage:id 条目的ID等于同一平台上的用户ID，
+           platform:GroupMessage:id 条目的ID等于同一平台上的群ID；群号/QQ号 条目匹配该群中的该发送者
+        4. 以上都未命中时检查规则：unified_msg_origin 匹配 prefix/glob/re 规则，
+           或用户ID、群ID、会话ID 落在 range 规则内（受平台限制）
+
+        session_id / platform_id 为调用方已从 unified_msg_origin 解析出的会话ID和平台ID，未传入时在此解析。
+        1~3 都是常数次集合查找；range/prefix 规则为二分查找和按长度分桶的集合查找，glob/re 规则为一次合并正则匹配
+        """
+        if not self.size:
+            return False
+
+        full = self.full
+        if unified_msg_origin:
+            if unified_msg_origin in full:
+                return True
+            if session_id is None or platform_id is None:
+                platform_id, _, session_id = parse_origin(unified_msg_origin, group_id)
+        if user_id and user_id in full:
+            return True
+        if group_id and group_id in full:
+            return True
+
+        platform_allowed = self.platforms is None or platform_id is None or platform_id in self.platforms
+        if platform_allowed:
+            ids = self.ids
+            if user_id and user_id in ids:
+                return True
+            if group_id and group_id in ids:
+                return True
+            if session_id and session_id in ids:
+                return True
+            if group_id and user_id and self.pairs and (group_id, user_id) in self.pairs:
+                return True
+
+        scoped = self.scoped
+        if scoped and platform_id:
+            if user_id:
+                friends = scoped.get((platform_id, FRIEND_MESSAGE))
+                if friends is not None and user_id in friends:
+                    return True
+            if group_id:
+                groups = scoped.get((platform_id, GROUP_MESSAGE))
+                if groups is not None and group_id in groups:
+                    return True
+
+        rules = self.rules
+        if rules is not None:
+            if rules.match_origin(unified_msg_origin):
+                return True
+            if platform_allowed and (rules.match_id(user_id) or rules.match_id(group_id)
+                                     or rules.match_id(session_id)):
+                return True
+        return False
+
+
+def compile_whitelist(items, platform_ids=None, compact_threshold: int = COMPACT_THRESHOLD) -> WhitelistIndex:
+    """将配置中的白名单列表编译为索引，纯ID条目展开到 platform_ids 中的所有平台"""
+    if not items and not platform_ids:
+        return _EMPTY
+    return WhitelistIndex(items or (), platform_ids, compact_threshold)
+
+
+_EMPTY = WhitelistIndex()
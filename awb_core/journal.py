@@ -0,0 +1,95 @@
+"""
+反馈频率控制状态持久化
+以追加写日志的形式记录当天已发送反馈的会话，插件重启后可恢复，避免重启后集中重发反馈
+"""
+
+import asyncio
+import os
+
+
+class FeedbackJournal:
+    """追加写的反馈记录日志
+
+    文件每行格式为 "<日期>\\t<unified_msg_origin>"。
+
+    - 读取：首次需要时一次性读取，只保留当天的记录
+    - 写入：record 只追加到内存队列，延迟 flush_delay 秒后在线程池中批量写入，
+      事件处理路径上没有任何文件 IO；不调用 fsync，崩溃时最多丢失最后一批记录
+    - 压缩：日期变化后的第一次写入会截断文件，文件中始终只有当天的记录
+
+    参数:
+        path: 日志文件路径
+        flush_delay: 批量写入的延迟秒数
+    """
+
+    def __init__(self, path, flush_delay: float = 5.0):
+        self.path = str(path)
+        self.flush_delay = flush_delay
+        self.loaded = False
+        self._pending = []
+        # 文件中记录所属的日期，日期不同时下次写入截断文件
+        self._file_day = None
+        self._flush_task = None
+        self._lock = asyncio.Lock()
+
+    def load(self, day: str) -> list:
+        """读取当天已发送过反馈的会话"""
+        self.loaded = True
+        keys = []
+        stale = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record_day, sep, key = line.rstrip("\n").partition("\t")
+                    if not sep or not key:
+                        continue
+                    if record_day == day:
+                        keys.append(key)
+                    else:
+                        stale = True
+        except FileNotFoundError:
+            return keys
+        # 文件中有过期记录时，下次写入重写整个文件
+        self._file_day = None if stale else day
+        if stale:
+            self._pending[:0] = [(day, key) for key in keys]
+        return keys
+
+    def record(self, day: str, key: str):
+        """记录已发送反馈的会话，稍后批量写入"""
+        self._pending.append((day, key))
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self):
+        """将队列中的记录写入文件（在线程池中执行）"""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, batch)
+
+    def _write(self, batch: list):
+        day = batch[-1][0]
+        lines = [f"{d}\t{k}\n" for d, k in batch if d == day]
+        mode = "a" if self._file_day == day else "w"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, mode, encoding="utf-8") as f:
+            f.writelines(lines)
+        self._file_day = day
+
+    async def close(self):
+        """停止延迟写入并写入剩余记录"""
+        task = self._flush_task
+        if task is not None and not task.done():
+            task.cancel()
+        await self.flush()
@@ -0,0 +1,41 @@
+"""
+名单分页与前缀搜索
+/awb list 只拼接请求的一页；前缀搜索在排序视图上二分查找，每次查询与名单总长度无关
+"""
+
+from bisect import bisect_left
+
+# 大于任何条目字符的上界，prefix + _MAX_CHAR 是所有以 prefix 开头的字符串的上界
+_MAX_CHAR = "\U0010ffff"
+
+
+class EntryView:
+    """名单条目的排序视图
+
+    记录创建时 ConfigWatcher 的代数，代数变化（名单被替换、增删或由管理命令修改）后视为过期，
+    与索引使用同一套变更检测。排序只在名单变更后的第一次搜索时进行一次
+    """
+
+    __slots__ = ("generation", "entries")
+
+    def __init__(self, source: list, generation: int):
+        self.generation = generation
+        self.entries = sorted(source)
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
+
+    def prefix_range(self, prefix: str) -> tuple:
+        """以 prefix 开头的条目在 entries 中的区间 [lo, hi)，O(log n)"""
+        if not prefix:
+            return 0, len(self.entries)
+        return bisect_left(self.entries, prefix), bisect_left(self.entries, prefix + _MAX_CHAR)
+
+
+def paginate(total: int, page: int, page_size: int) -> tuple:
+    """计算分页，返回 (页码, 总页数, 起始下标, 结束下标)；页码超出范围时取最近的有效页"""
+    page_size = max(int(page_size or 0), 1)
+    pages = max((total + page_size - 1) // page_size, 1)
+    page = min(max(int(page or 1), 1), pages)
+    start = (page - 1) * page_size
+    return page, pages, start, min(start + page_size, total)
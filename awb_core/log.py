@@ -0,0 +1,31 @@
+"""
+惰性调试日志门面
+只在初始化和配置变更时检查一次日志级别，调试日志关闭时不做任何字符串格式化
+"""
+
+import logging
+
+
+class LazyLogger:
+    """按级别惰性格式化的日志门面
+
+    用法:
+        log.debug("会话 %s 被阻止", umo)      # 参数只在调试级别开启时才格式化
+        if log.debug_enabled:                # 参数本身计算代价较高时先判断
+            log.debug("白名单: %s", expensive())
+    """
+
+    __slots__ = ("logger", "debug_enabled")
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.debug_enabled = False
+        self.refresh()
+
+    def refresh(self):
+        """重新检查日志级别（插件加载和配置变更时调用）"""
+        self.debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, msg: str, *args):
+        if self.debug_enabled:
+            self.logger.debug(msg, *args)
@@ -0,0 +1,217 @@
+"""
+运行指标
+进程内的事件计数、判定结果计数和单事件延迟直方图。记录只做整数累加和一次二分查找，
+可输出为文本摘要、JSON 或 Prometheus 文本格式，并可由后台任务周期性写入文件
+"""
+
+import asyncio
+from bisect import bisect_left
+import json
+import os
+import time
+
+ALLOWED = "allowed"
+BLOCKED = "blocked"
+
+# 延迟直方图的桶上界（微秒），最后一个桶为 +Inf
+LATENCY_BUCKETS_US = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图，observe 的参数为纳秒"""
+
+    __slots__ = ("buckets_us", "_bounds", "counts", "count", "total_ns")
+
+    def __init__(self, buckets_us=LATENCY_BUCKETS_US):
+        self.buckets_us = tuple(buckets_us)
+        self._bounds = [int(bound * 1000) for bound in self.buckets_us]
+        self.counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total_ns = 0
+
+    def observe(self, elapsed_ns: int):
+        self.counts[bisect_left(self._bounds, elapsed_ns)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def percentile(self, pct: float):
+        """返回第 pct 百分位所在桶的上界（微秒），落在 +Inf 桶时返回 None"""
+        if not self.count:
+            return 0
+        rank = self.count * pct / 100
+        seen = 0
+        for bound, count in zip(self.buckets_us, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets_us": list(self.buckets_us),
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum_us": self.total_ns / 1000,
+        }
+
+
+class FilterMetrics:
+    """过滤器运行指标
+
+    属性:
+        events: 消息类型取值 -> 事件数
+        decisions: (ALLOWED / BLOCKED, 类别) -> 事件数
+        feedback_sent: 已发送的反馈消息数
+        latency: check_whitelist 单事件耗时直方图
+
+    参数:
+        collect: 可选，返回附加指标（如各缓存的命中率）的函数，在生成快照时调用
+        dump_path: 可选，快照周期性写入该文件
+        dump_format: "json" 或 "prometheus"
+        dump_interval: 写入周期（秒）
+    """
+
+    def __init__(self, collect=None, dump_path=None, dump_format: str = "json", dump_interval: float = 60):
+        self.collect = collect
+        self.dump_path = str(dump_path) if dump_path else None
+        self.dump_format = dump_format
+        self.dump_interval = dump_interval
+        self.started = time.time()
+        self.events = {}
+        self.decisions = {}
+        self.feedback_sent = 0
+        self.latency = LatencyHistogram()
+        self._task = None
+
+    def observe(self, message_type: str, outcome: tuple, elapsed_ns: int):
+        """记录一个事件的消息类型、判定结果和耗时"""
+        events = self.events
+        events[message_type] = events.get(message_type, 0) + 1
+        decisions = self.decisions
+        decisions[outcome] = decisions.get(outcome, 0) + 1
+        self.latency.observe(elapsed_ns)
+        if self._task is None and self.dump_path:
+            self._start()
+
+    def _start(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.dump_interval)
+            await self.dump()
+
+    def snapshot(self) -> dict:
+        """生成当前指标的快照（可直接序列化为 JSON）"""
+        snapshot = {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "events": dict(self.events),
+            "decisions": [
+                {"result": result, "category": category, "count": count}
+                for (result, category), count in sorted(self.decisions.items())
+            ],
+            "feedback_sent": self.feedback_sent,
+            "latency": self.latency.snapshot(),
+        }
+        if self.collect is not None:
+            snapshot["caches"] = self.collect()
+        return snapshot
+
+    async def dump(self, path=None, dump_format: str = None) -> str:
+        """将快照写入文件（在线程池中执行），返回写入的路径"""
+        path = str(path or self.dump_path)
+        text = render(self.snapshot(), dump_format or self.dump_format)
+        await asyncio.get_running_loop().run_in_executor(None, _write_atomic, path, text)
+        return path
+
+    async def close(self):
+        """停止后台任务，并在配置了写入文件时写入最后一次快照"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self.dump_path:
+            await self.dump()
+
+
+def _write_atomic(path: str, text: str):
+    """先写临时文件再替换，采集方不会读到写了一半的文件"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def render(snapshot: dict, dump_format: str) -> str:
+    if dump_format == "prometheus":
+        return render_prometheus(snapshot)
+    return json.dumps(snapshot, ensure_ascii=False, indent=2)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def render_prometheus(snapshot: dict) -> str:
+    """输出为 Prometheus 文本格式（可配合 node_exporter 的 textfile collector 采集）"""
+    lines = [
+        "# TYPE awb_events_total counter",
+        *(f'awb_events_total{{message_type="{_escape(t)}"}} {n}' for t, n in sorted(snapshot["events"].items())),
+        "# TYPE awb_decisions_total counter",
+        *(f'awb_decisions_total{{result="{_escape(d["result"])}",category="{_escape(d["category"])}"}} {d["count"]}'
+          for d in snapshot["decisions"]),
+        "# TYPE awb_feedback_sent_total counter",
+        f"awb_feedback_sent_total {snapshot['feedback_sent']}",
+        "# TYPE awb_check_latency_seconds histogram",
+    ]
+    latency = snapshot["latency"]
+    cumulative = 0
+    for bound, count in zip(latency["buckets_us"], latency["counts"]):
+        cumulative += count
+        lines.append(f'awb_check_latency_seconds_bucket{{le="{bound / 1e6:g}"}} {cumulative}')
+    lines.append(f'awb_check_latency_seconds_bucket{{le="+Inf"}} {latency["count"]}')
+    lines.append(f"awb_check_latency_seconds_sum {latency['sum_us'] / 1e6:.9f}")
+    lines.append(f"awb_check_latency_seconds_count {latency['count']}")
+    for cache, stats in sorted(snapshot.get("caches", {}).items()):
+        for name, value in sorted(stats.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f'awb_cache_{name}{{cache="{_escape(cache)}"}} {value}')
+    lines.append(f"awb_uptime_seconds {snapshot['uptime_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+def format_summary(snapshot: dict) -> str:
+    """生成 /awb stats 显示的文本摘要"""
+    lines = [f"运行时间: {snapshot['uptime_seconds']:.0f} 秒"]
+    events = snapshot["events"]
+    lines.append(f"事件总数: {sum(events.values())}"
+                 + (f"（{', '.join(f'{t} {n}' for t, n in sorted(events.items()))}）" if events else ""))
+    for result, label in ((ALLOWED, "放行"), (BLOCKED, "阻止")):
+        items = [(d["category"], d["count"]) for d in snapshot["decisions"] if d["result"] == result]
+        total = sum(count for _, count in items)
+        lines.append(f"{label}: {total}" + (f"（{', '.join(f'{c} {n}' for c, n in items)}）" if items else ""))
+    lines.append(f"已发送反馈: {snapshot['feedback_sent']}")
+
+    latency = snapshot["latency"]
+    if latency["count"]:
+        histogram = LatencyHistogram(latency["buckets_us"])
+        histogram.counts = list(latency["counts"])
+        histogram.count = latency["count"]
+
+        def bound(pct):
+            value = histogram.percentile(pct)
+            return f"≤{value:g}us" if value is not None else f">{latency['buckets_us'][-1]:g}us"
+
+        lines.append(f"单事件耗时: 平均 {latency['sum_us'] / latency['count']:.2f}us, "
+                     f"p50 {bound(50)}, p90 {bound(90)}, p99 {bound(99)}")
+    for cache, stats in sorted(snapshot.get("caches", {}).items()):
+        lines.append(f"{cache}: " + ", ".join(f"{name}={value}" for name, value in stats.items()))
+    return "\n".join(lines)
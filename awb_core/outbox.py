@@ -0,0 +1,123 @@
+"""
+反馈发送队列
+被阻止的会话需要发送反馈时只放入有界队列，由后台任务按全局速率上限逐条发送，
+不占用事件处理路径，刷屏或重启后集中反馈时也不会与正常回复争抢发送通道
+"""
+
+import asyncio
+import time
+
+
+class FeedbackOutbox:
+    """有界、按会话合并、全局限速的反馈发送队列
+
+    - offer: 事件处理路径上调用，只做一次字典查找和一次插入（O(1)），从不等待发送
+    - 同一会话已在队列中时合并为一条；队列满时丢弃新的反馈（计入 dropped）
+    - 后台任务按加入顺序取出，令牌桶限制全局发送速率（rate 条/秒，允许 burst 条突发）
+
+    参数:
+        send: 实际发送的协程函数 send(origin, message)
+        maxsize: 队列中最多等待的会话数
+        rate: 每秒最多发送的条数，<= 0 时不限速
+        burst: 令牌桶容量（允许的突发条数）
+        logger: 发送失败时输出警告
+    """
+
+    def __init__(self, send, maxsize: int = 200, rate: float = 2.0, burst: int = 5, logger=None, clock=time.monotonic):
+        self.send = send
+        self.maxsize = max(int(maxsize or 0), 1)
+        self.rate = max(float(rate or 0), 0.0)
+        self.burst = max(int(burst or 0), 1)
+        self.logger = logger
+        self.clock = clock
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        # origin -> 消息，按加入顺序发送
+        self._pending = {}
+        self._tokens = float(self.burst)
+        self._refilled = clock()
+        self._task = None
+        self._wakeup = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def offer(self, origin: str, message) -> bool:
+        """放入一条反馈，返回是否已排队（合并到已排队的反馈也返回 True）"""
+        pending = self._pending
+        if origin in pending:
+            self.coalesced += 1
+            return True
+        if len(pending) >= self.maxsize:
+            self.dropped += 1
+            return False
+        pending[origin] = message
+        if self._task is None:
+            self._start()
+        elif len(pending) == 1:
+            self._wakeup.set()
+        return True
+
+    def _start(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _acquire(self):
+        """等待一个发送令牌"""
+        if self.rate <= 0:
+            return
+        while True:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def _run(self):
+        pending = self._pending
+        while True:
+            if not pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._acquire()
+            origin = next(iter(pending))
+            message = pending.pop(origin)
+            try:
+                await self.send(origin, message)
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                if self.logger is not None:
+                    self.logger.warning(f"发送反馈消息到 {origin} 失败: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "maxsize": self.maxsize,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def close(self) -> int:
+        """停止后台任务，返回未发送而丢弃的反馈数（停用时不再集中发送）"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        discarded = len(self._pending)
+        self._pending.clear()
+        return discarded
@@ -0,0 +1,86 @@
+"""
+配置延迟写入
+管理命令修改配置后只标记为待保存，在短暂的合并窗口后于线程池中写入一次
+"""
+
+import asyncio
+
+
+class DebouncedSaver:
+    """合并多次保存请求的写入器
+
+    mark_dirty 只记录状态并（必要时）启动一个延迟任务；delay 秒内的多次修改合并为一次
+    save_func 调用，在默认线程池中执行，不阻塞事件循环。没有运行中的事件循环或 delay <= 0 时
+    立即同步保存。
+
+    参数:
+        save_func: 实际执行保存的函数（如 AstrBotConfig.save_config）
+        delay: 合并窗口（秒）
+        logger: 保存失败时输出警告
+    """
+
+    def __init__(self, save_func, delay: float = 1.0, logger=None):
+        self.save_func = save_func
+        self.delay = delay
+        self.logger = logger
+        self.dirty = False
+        # 实际写入次数
+        self.save_count = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        """标记配置已修改，稍后保存"""
+        self.dirty = True
+        if self.delay <= 0:
+            self._save_now()
+            return
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save_now()
+            return
+        self._task = loop.create_task(self._save_later())
+
+    def _save_now(self):
+        self.dirty = False
+        self.save_count += 1
+        self.save_func()
+
+    async def _save_later(self):
+        # 写入期间又有新的修改时，再等待一个合并窗口后继续保存
+        while True:
+            await asyncio.sleep(self.delay)
+            await self.flush()
+            if not self.dirty:
+                return
+
+    async def flush(self):
+        """若有未保存的修改，立即在线程池中保存"""
+        async with self._lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            self.save_count += 1
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.save_func)
+            except Exception as e:
+                # 保存失败时保留待保存状态，下次 flush 重试
+                self.dirty = True
+                if self.logger is not None:
+                    self.logger.warning(f"保存插件配置失败: {e}")
+                else:
+                    raise
+
+    async def close(self):
+        """取消延迟任务并确保所有修改都已保存（插件停用时调用）"""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
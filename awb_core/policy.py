@@ -0,0 +1,97 @@
+"""
+策略计划
+将开关、白名单和黑名单配置预编译为「消息类型 -> 最少需要执行的检查」映射，配置变更时重新编译
+"""
+
+# unified_msg_origin 及 MessageType 中使用的消息类型取值
+FRIEND_MESSAGE = "FriendMessage"
+GROUP_MESSAGE = "GroupMessage"
+OTHER_MESSAGE = "OtherMessage"
+
+SWITCH_KEYS = (
+    "enable_temp_session_control",
+    "enable_friend_message_whitelist",
+    "enable_group_message_whitelist",
+    "enable_blacklist",
+)
+
+
+class TypePlan:
+    """单个消息类型需要执行的检查
+
+    属性:
+        detect_temp: 是否需要识别临时会话
+        block_temp: 识别为临时会话后是否阻止（否则直接放行）
+        list_key: 需要检查的白名单配置键，None 表示不检查白名单
+        blacklist_keys: 需要检查的黑名单配置键（按顺序），空元组表示不检查黑名单
+
+    判定优先级（由高到低）：全局白名单 > 黑名单 > 请求事件放行 > 临时会话控制 > 按消息类型的白名单。
+    每个事件的名单命中结果（全局白名单、黑名单、白名单）一次性计算并整体缓存
+    """
+
+    __slots__ = ("detect_temp", "block_temp", "list_key", "blacklist_keys")
+
+    def __init__(self, detect_temp: bool, block_temp: bool, list_key: str = None, blacklist_keys: tuple = ()):
+        self.detect_temp = detect_temp
+        self.block_temp = block_temp
+        self.list_key = list_key
+        self.blacklist_keys = blacklist_keys
+
+    def __repr__(self) -> str:
+        return (f"TypePlan(detect_temp={self.detect_temp}, block_temp={self.block_temp}, "
+                f"list_key={self.list_key!r}, blacklist_keys={self.blacklist_keys!r})")
+
+
+class PolicyPlan:
+    """编译后的策略计划
+
+    属性:
+        active: 是否存在任何可能阻止消息的检查，为 False 时无需做任何处理
+        by_type: 消息类型取值 -> TypePlan，不在映射中的消息类型直接放行
+    """
+
+    __slots__ = ("active", "by_type")
+
+    def __init__(self, by_type: dict):
+        self.by_type = by_type
+        self.active = bool(by_type)
+
+    def __repr__(self) -> str:
+        return f"PolicyPlan(active={self.active}, by_type={self.by_type})"
+
+
+def compile_policy(config, indexes) -> PolicyPlan:
+    """根据开关和白名单、黑名单索引编译策略计划
+
+    - 白名单开关开启但白名单为空时允许所有消息通过，因此视为未启用；黑名单为空时同样不检查
+    - 私聊中的临时会话（如 QQ 群临时会话）只受临时会话控制约束，不受好友私聊白名单约束，
+      因此只要临时会话控制或好友私聊白名单任一生效，私聊消息就需要识别临时会话
+    - 全局黑名单对所有消息类型生效，好友私聊/群聊黑名单只对对应类型生效
+    """
+    temp_control = bool(config.get("enable_temp_session_control", False))
+    friend_key = None
+    if config.get("enable_friend_message_whitelist", False) and indexes.get("friend_message_whitelist"):
+        friend_key = "friend_message_whitelist"
+    group_key = None
+    if config.get("enable_group_message_whitelist", False) and indexes.get("group_message_whitelist"):
+        group_key = "group_message_whitelist"
+
+    blacklist_enabled = bool(config.get("enable_blacklist", False))
+
+    def blacklist(*keys) -> tuple:
+        if not blacklist_enabled:
+            return ()
+        return tuple(key for key in keys if indexes.get(key))
+
+    friend_blacklist = blacklist("global_blacklist", "friend_message_blacklist")
+    group_blacklist = blacklist("global_blacklist", "group_message_blacklist")
+    other_blacklist = blacklist("global_blacklist")
+
+    by_type = {}
+    if temp_control or friend_key or friend_blacklist:
+        by_type[FRIEND_MESSAGE] = TypePlan(True, temp_control, friend_key, friend_blacklist)
+    if group_key or group_blacklist:
+        by_type[GROUP_MESSAGE] = TypePlan(False, False, group_key, group_blacklist)
+    if temp_control or other_blacklist:
+        by_type[OTHER_MESSAGE] = TypePlan(True, temp_control, None, other_blacklist)
+    return PolicyPlan(by_type)
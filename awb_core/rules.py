@@ -0,0 +1,162 @@
+"""
+范围与模式规则
+白名单条目除精确ID外还支持以下规则，配置变更时一次性编译：
+
+- range:10000-19999     数字ID范围（含两端），匹配用户ID、群ID、会话ID。编译为合并后的有序区间数组，二分查找
+- prefix:qq:GroupMessage:  unified_msg_origin 前缀。按前缀长度分桶，每种长度一次集合查找
+- glob:*:GroupMessage:9*   unified_msg_origin 通配符（fnmatch 语法，整串匹配）
+- re:^qq:FriendMessage:1\\d{4}$  unified_msg_origin 正则（整串匹配）
+
+range 和 prefix 规则的匹配复杂度与规则数量无关（或为对数级），可放心用于数万条规则。
+glob 和 re 规则合并为一个交替正则，一次匹配完成；正则引擎仍需逐个尝试分支，适合数百条以内的模式
+"""
+
+from bisect import bisect_right
+import fnmatch
+import re
+
+RULE_PREFIXES = ("range:", "prefix:", "glob:", "re:")
+
+# 含数字反向引用的正则合并后组号会变化，只能单独匹配
+_BACKREF_PATTERN = re.compile(r"\\[1-9]")
+# 全局内联标志（如开头的 (?i)）作用于整个正则，合并后在非开头位置会编译失败，只能单独匹配
+_GLOBAL_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.VERBOSE | re.ASCII
+
+
+def is_rule(entry: str) -> bool:
+    """条目是否为范围或模式规则"""
+    return entry.startswith(RULE_PREFIXES)
+
+
+def _parse_range(spec: str):
+    start, sep, end = spec.partition("-")
+    start, end = start.strip(), end.strip() if sep else start.strip()
+    if not start.isdigit() or not end.isdigit():
+        raise ValueError(f"范围必须为 起始-结束 格式的非负整数: {spec}")
+    start, end = int(start), int(end)
+    if start > end:
+        raise ValueError(f"范围起始值大于结束值: {spec}")
+    return start, end
+
+
+def _translate_glob(spec: str) -> str:
+    """将通配符转换为正则
+
+    开头的 "*:" 表示任意平台，平台ID中不含 ":"，因此转换为 [^:]*，
+    使合并后的正则在不匹配的分支上立即失败，而不是对每个分支都回溯扫描整个字符串
+    """
+    if spec.startswith("*:"):
+        return "[^:]*" + fnmatch.translate(spec[1:])
+    return fnmatch.translate(spec)
+
+
+def _can_merge(compiled, spec: str, group_names: set) -> bool:
+    """正则能否并入合并后的交替正则（无数字反向引用、无全局内联标志、命名组不重名）"""
+    if _BACKREF_PATTERN.search(spec) or compiled.flags & _GLOBAL_FLAGS:
+        return False
+    names = compiled.groupindex.keys()
+    if not group_names.isdisjoint(names):
+        return False
+    group_names.update(names)
+    return True
+
+
+def _merge_ranges(ranges: list) -> tuple:
+    """合并重叠或相邻的区间，返回 (起点数组, 终点数组)"""
+    starts, ends = [], []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            if end > ends[-1]:
+                ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class RuleSet:
+    """编译后的范围与模式规则
+
+    属性:
+        starts / ends: 合并后的不相交数字区间，按起点排序
+        prefixes: 前缀长度 -> 该长度的前缀集合，按长度升序
+        pattern: 所有 glob/re 规则合并成的正则，没有时为 None
+        patterns: 无法合并的正则（含反向引用、全局内联标志或重名的命名组），逐个匹配
+        size: 有效规则数量
+        errors: 无法解析的规则及原因
+    """
+
+    __slots__ = ("starts", "ends", "prefixes", "pattern", "patterns", "size", "errors")
+
+    def __init__(self, rules=()):
+        ranges = []
+        prefixes = {}
+        sources = []
+        group_names = set()
+        self.patterns = []
+        self.errors = []
+        self.size = 0
+        for rule in rules:
+            kind, _, spec = rule.partition(":")
+            try:
+                if kind == "range":
+                    ranges.append(_parse_range(spec))
+                elif kind == "prefix":
+                    if not spec:
+                        raise ValueError("前缀不能为空")
+                    prefixes.setdefault(len(spec), set()).add(spec)
+                elif kind == "glob":
+                    sources.append(_translate_glob(spec))
+                elif kind == "re":
+                    compiled = re.compile(spec)
+                    if _can_merge(compiled, spec, group_names):
+                        sources.append(spec)
+                    else:
+                        self.patterns.append(compiled)
+                else:
+                    raise ValueError(f"未知的规则类型: {kind}")
+            except (ValueError, re.error) as e:
+                self.errors.append((rule, str(e)))
+                continue
+            self.size += 1
+
+        self.starts, self.ends = _merge_ranges(ranges)
+        self.prefixes = tuple((length, frozenset(prefixes[length])) for length in sorted(prefixes))
+        self.pattern = None
+        if sources:
+            try:
+                self.pattern = re.compile("|".join(f"(?:{source})" for source in sources))
+            except re.error:
+                # 无法合并的正则已在解析时单独编译，这里只兜底未预见的情况，退回逐个匹配
+                self.patterns.extend(re.compile(source) for source in sources)
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def match_id(self, value: str) -> bool:
+        """数字ID是否落在某个范围内，O(log n)"""
+        if not self.starts or not value or not value.isdigit():
+            return False
+        number = int(value)
+        i = bisect_right(self.starts, number) - 1
+        return i >= 0 and number <= self.ends[i]
+
+    def match_origin(self, origin: str) -> bool:
+        """unified_msg_origin 是否匹配某个前缀、通配符或正则规则"""
+        if not origin:
+            return False
+        length = len(origin)
+        for prefix_length, prefixes in self.prefixes:
+            if prefix_length > length:
+                break
+            if origin[:prefix_length] in prefixes:
+                return True
+        if self.pattern is not None and self.pattern.fullmatch(origin):
+            return True
+        for pattern in self.patterns:
+            if pattern.fullmatch(origin):
+                return True
+        return False
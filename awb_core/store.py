@@ -0,0 +1,170 @@
+"""
+外部白名单存储
+超大白名单保存在 SQLite 索引表中，成员判断为 B 树查找，不需要在内存中保存字符串列表
+"""
+
+from pathlib import Path
+import threading
+
+from .classify import parse_origin
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS whitelist_entries (
+    list_key TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (list_key, entry)
+) WITHOUT ROWID;
+"""
+
+# 全部候选条目都在主键上做一次 IN 查找
+_MATCH_SQL = (
+    "SELECT 1 FROM whitelist_entries WHERE list_key = ? AND entry IN (?, ?, ?, ?, ?, ?) LIMIT 1"
+)
+
+
+class SQLiteWhitelistStore:
+    """SQLite 白名单存储
+
+    表以 (list_key, entry) 为主键，匹配时把用户ID、群ID、会话ID 以及按平台拼出的
+    platform:Type:id 作为候选条目，一次主键查询即可完成与 WhitelistIndex 相同语义的匹配，复杂度 O(log n)。
+
+    写入和导出使用写连接，匹配和分页查询使用独立的只读连接，两者各有一把锁：WAL 模式下读取不等待写事务，
+    线程池中批量导入期间，事件循环上的匹配读取导入开始前的快照，不会被阻塞。
+    """
+
+    def __init__(self, path):
+        # sqlite3 只在启用外部存储时使用，延迟导入以缩短插件加载时间
+        import sqlite3
+
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._counts = dict(self._conn.execute(
+            "SELECT list_key, COUNT(*) FROM whitelist_entries GROUP BY list_key"
+        ).fetchall())
+        # 只读连接在建表之后打开
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(
+            Path(self.path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False, isolation_level=None
+        )
+
+    def count(self, list_key: str) -> int:
+        return self._counts.get(list_key, 0)
+
+    def match(self, list_key: str, user_id=None, group_id=None, unified_msg_origin=None,
+              session_id=None, platform_id=None, bare=True) -> bool:
+        """与 WhitelistIndex.match 相同语义的匹配
+
+        bare 为 False 时（消息来自未配置的平台）纯ID条目不参与匹配，只匹配带 ":" 的条目
+        """
+        if not self._counts.get(list_key):
+            return False
+        candidates = (
+            unified_msg_origin,
+            user_id if bare else None,
+            group_id if bare else None,
+            session_id if bare else None,
+            f"{platform_id}:FriendMessage:{user_id}" if platform_id and user_id else None,
+            f"{platform_id}:GroupMessage:{group_id}" if platform_id and group_id else None,
+        )
+        with self._read_lock:
+            row = self._reader.execute(_MATCH_SQL, (list_key,) + candidates).fetchone()
+        return row is not None
+
+    def add(self, list_key: str, entries) -> int:
+        """批量添加条目（单个事务），返回新增条目数"""
+        rows = [(list_key, entry) for entry in entries if entry]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO whitelist_entries (list_key, entry) VALUES (?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            added = self._conn.total_changes - before
+            self._counts[list_key] = self._counts.get(list_key, 0) + added
+        return added
+
+    def remove(self, list_key: str, entries) -> int:
+        """批量删除条目（单个事务），返回删除条目数"""
+        rows = [(list_key, entry) for entry in entries]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM whitelist_entries WHERE list_key = ? AND entry = ?", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            removed = self._conn.total_changes - before
+            self._counts[list_key] = self._counts.get(list_key, 0) - removed
+        return removed
+
+    def entries(self, list_key: str) -> list:
+        """按条目排序返回全部条目"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT entry FROM whitelist_entries WHERE list_key = ? ORDER BY entry", (list_key,)
+            )]
+
+    def page(self, list_key: str, prefix: str = "", offset: int = 0, limit: int = 50) -> tuple:
+        """按条目排序分页读取，prefix 非空时只读取以其开头的条目，返回 (条目列表, 匹配条目数)
+
+        前缀条件是主键上的范围查找，只读取请求的一页；匹配条目数在 prefix 为空时直接取缓存的计数
+        """
+        upper = prefix + "\U0010ffff"
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT entry FROM whitelist_entries WHERE list_key = ? AND entry >= ? AND entry < ? "
+                "ORDER BY entry LIMIT ? OFFSET ?", (list_key, prefix, upper, limit, offset)
+            ).fetchall()
+            if prefix:
+                total = self._reader.execute(
+                    "SELECT COUNT(*) FROM whitelist_entries WHERE list_key = ? AND entry >= ? AND entry < ?",
+                    (list_key, prefix, upper)
+                ).fetchone()[0]
+            else:
+                total = self._counts.get(list_key, 0)
+        return [row[0] for row in rows], total
+
+    def close(self):
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
+
+
+class LayeredIndex:
+    """配置白名单（覆盖层）+ 外部存储的组合索引，接口与 WhitelistIndex 相同"""
+
+    __slots__ = ("overlay", "store", "list_key")
+
+    def __init__(self, overlay, store: SQLiteWhitelistStore, list_key: str):
+        self.overlay = overlay
+        self.store = store
+        self.list_key = list_key
+
+    def __bool__(self) -> bool:
+        return bool(self.overlay) or self.store.count(self.list_key) > 0
+
+    def __len__(self) -> int:
+        return len(self.overlay) + self.store.count(self.list_key)
+
+    def match(self, user_id: str = None, group_id: str = None,
+              unified_msg_origin: str = None, session_id: str = None, platform_id: str = None) -> bool:
+        if self.overlay.match(user_id, group_id, unified_msg_origin, session_id, platform_id):
+            return True
+        if session_id is None or platform_id is None:
+            platform_id, _, session_id = parse_origin(unified_msg_origin, group_id)
+        return self.store.match(self.list_key, user_id, group_id, unified_msg_origin, session_id or None,
+                                platform_id, bare=self.overlay.allows_platform(platform_id))
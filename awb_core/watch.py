@@ -0,0 +1,124 @@
+"""
+配置变更检测
+对白名单相关配置键做廉价指纹（对象身份 + 长度），只在真正变更时触发索引重建
+"""
+
+import time
+
+_MISSING = object()
+
+WATCHED_KEYS = (
+    "friend_message_whitelist",
+    "group_message_whitelist",
+    "global_whitelist",
+    "friend_message_blacklist",
+    "group_message_blacklist",
+    "global_blacklist",
+    "platform_ids",
+)
+
+
+def _fingerprint(value):
+    """生成配置值的指纹
+
+    列表等容器记录对象本身和长度：WebUI 保存配置时会替换为新对象，
+    add_wl/del_wl 原地增删会改变长度。同时持有对象引用，避免旧对象被回收后
+    新对象复用同一内存地址导致误判为未变更。其他值直接比较值本身。
+    """
+    try:
+        return (value, len(value))
+    except TypeError:
+        return (value, -1)
+
+
+class ConfigWatcher:
+    """配置键指纹监视器
+
+    generation 为单调递增的代数，每次检测到变更时加一，可用于判断派生数据是否过期
+    """
+
+    __slots__ = ("config", "keys", "generation", "_fingerprints", "_forced")
+
+    def __init__(self, config, keys=WATCHED_KEYS):
+        self.config = config
+        self.keys = tuple(keys)
+        self.generation = 0
+        self._fingerprints = {key: (_MISSING, -1) for key in self.keys}
+        # 首次 poll 时所有键都视为已变更
+        self._forced = set(self.keys)
+
+    def invalidate(self, key: str = None):
+        """显式标记配置键已变更（插件自身修改配置后调用），不指定键时标记全部"""
+        if key is None:
+            self._forced.update(self.keys)
+        else:
+            self._forced.add(key)
+
+    def poll(self) -> tuple:
+        """检查配置是否变更，返回发生变更的键（无变更时返回空元组）
+
+        每个键只做一次 dict 查找、一次身份比较和一次长度比较，不会遍历列表内容
+        """
+        config = self.config
+        fingerprints = self._fingerprints
+        forced = self._forced
+        changed = None
+        for key in self.keys:
+            value = config.get(key, _MISSING)
+            if key not in forced:
+                old_value, old_len = fingerprints[key]
+                if old_len < 0:
+                    if value is old_value or value == old_value:
+                        continue
+                elif value is old_value and len(value) == old_len:
+                    continue
+            if changed is None:
+                changed = []
+            changed.append(key)
+            fingerprints[key] = _fingerprint(value)
+        if changed is None:
+            return ()
+        self._forced.clear()
+        self.generation += 1
+        return tuple(changed)
+
+
+def _platform_fingerprint(platforms) -> tuple:
+    """已启用平台的ID元组"""
+    return tuple(
+        platform.get("id") for platform in platforms
+        if isinstance(platform, dict) and platform.get("enable", False)
+    )
+
+
+class PlatformWatcher:
+    """AstrBot 平台配置监视器
+
+    WebUI 启用/停用适配器时会原地替换平台列表中的元素，列表对象和长度都可能不变，
+    因此按已启用平台的ID比较。平台配置很少变化，检查按 interval 秒节流，
+    两次检查之间 poll 只做一次时钟读取
+    """
+
+    __slots__ = ("get_platforms", "interval", "clock", "_next_check", "_fingerprint")
+
+    def __init__(self, get_platforms, interval: float = 5.0, clock=time.monotonic):
+        self.get_platforms = get_platforms
+        self.interval = interval
+        self.clock = clock
+        self._next_check = 0.0
+        self._fingerprint = None
+
+    def poll(self) -> bool:
+        """已启用的平台是否发生变化（首次调用返回 True）"""
+        now = self.clock()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+        try:
+            fingerprint = _platform_fingerprint(self.get_platforms() or ())
+        except Exception:
+            fingerprint = ()
+        if fingerprint == self._fingerprint:
+            return False
+        self._fingerprint = fingerprint
+        return True
@@ -0,0 +1,247 @@
+"""
+基准测试用的 AstrBot 桩模块
+只实现插件用到的最小接口，无需安装 AstrBot 即可加载插件并驱动 check_whitelist
+"""
+
+import enum
+import importlib.util
+import logging
+import os
+import sys
+import tempfile
+import types
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_PACKAGE = "awb_bench_plugin"
+
+
+class MessageType(enum.Enum):
+    GROUP_MESSAGE = "GroupMessage"
+    FRIEND_MESSAGE = "FriendMessage"
+    OTHER_MESSAGE = "OtherMessage"
+
+
+class AstrBotConfig(dict):
+    """内存中的插件配置，save_config 只计数不写文件"""
+
+    def __init__(self, config=None, default_config=None):
+        super().__init__(config or {})
+        object.__setattr__(self, "save_count", 0)
+
+    def save_config(self, replace_config=None):
+        if replace_config:
+            self.update(replace_config)
+        object.__setattr__(self, "save_count", self.save_count + 1)
+
+
+class MessageEventResult:
+    def __init__(self):
+        self.chain = []
+        self._stopped = False
+
+    def message(self, text):
+        self.chain.append(text)
+        return self
+
+    def stop_event(self):
+        self._stopped = True
+        return self
+
+    def use_t2i(self, use_t2i):
+        return self
+
+    def is_stopped(self):
+        return self._stopped
+
+
+class MessageChain:
+    def __init__(self):
+        self.chain = []
+
+    def message(self, text):
+        self.chain.append(text)
+        return self
+
+
+class AstrMessageEvent:
+    pass
+
+
+class Context:
+    def __init__(self, platforms=None):
+        self._config = {"platform": platforms or []}
+        # 主动发送的消息 (session, MessageChain)
+        self.sent_messages = []
+
+    def get_config(self):
+        return self._config
+
+    async def send_message(self, session, message_chain):
+        self.sent_messages.append((session, message_chain))
+        return True
+
+
+class Star:
+    def __init__(self, context):
+        self.context = context
+
+
+class StarTools:
+    data_dir = os.path.join(tempfile.gettempdir(), "awb_bench_data")
+
+    @classmethod
+    def get_data_dir(cls, plugin_name=None):
+        from pathlib import Path
+        path = Path(cls.data_dir) / (plugin_name or "plugin")
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+class _CommandGroup:
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def command(self, name, *args, **kwargs):
+        return lambda func: func
+
+    def group(self, name, *args, **kwargs):
+        return _CommandGroup(lambda *a, **k: None)
+
+
+class _Filter:
+    class EventMessageType(enum.Enum):
+        ALL = "all"
+
+    class PermissionType(enum.Enum):
+        ADMIN = "admin"
+
+    @staticmethod
+    def event_message_type(*args, **kwargs):
+        return lambda func: func
+
+    @staticmethod
+    def permission_type(*args, **kwargs):
+        return lambda func: func
+
+    @staticmethod
+    def command(*args, **kwargs):
+        return lambda func: func
+
+    @staticmethod
+    def command_group(name, *args, **kwargs):
+        return lambda func: _CommandGroup(func)
+
+
+def install():
+    """在 sys.modules 中注册 AstrBot 桩模块（已安装真实 AstrBot 时也会被覆盖）"""
+    if getattr(sys.modules.get("astrbot"), "__awb_stub__", False):
+        return
+
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    module("astrbot", __awb_stub__=True)
+    module("astrbot.api", AstrBotConfig=AstrBotConfig, logger=logging.getLogger("astrbot"))
+    module("astrbot.api.star", Context=Context, Star=Star, StarTools=StarTools,
+           register=lambda *args, **kwargs: (lambda cls: cls))
+    module("astrbot.api.event", AstrMessageEvent=AstrMessageEvent, MessageChain=MessageChain,
+           MessageEventResult=MessageEventResult, filter=_Filter)
+    module("astrbot.core")
+    module("astrbot.core.platform")
+    module("astrbot.core.platform.message_type", MessageType=MessageType)
+    module("astrbot.core.star", star_registry=[])
+    module("astrbot.core.config")
+    module("astrbot.core.config.astrbot_config", AstrBotConfig=AstrBotConfig)
+
+
+def load_plugin_module():
+    """以包的形式加载插件的 main.py（支持其中的相对导入）"""
+    install()
+    if PLUGIN_PACKAGE + ".main" in sys.modules:
+        return sys.modules[PLUGIN_PACKAGE + ".main"]
+    package = types.ModuleType(PLUGIN_PACKAGE)
+    package.__path__ = [PLUGIN_DIR]
+    sys.modules[PLUGIN_PACKAGE] = package
+    spec = importlib.util.spec_from_file_location(PLUGIN_PACKAGE + ".main", os.path.join(PLUGIN_DIR, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_plugin(config: dict, platforms=("aiocqhttp",)):
+    """创建插件实例"""
+    module = load_plugin_module()
+    context = Context([{"id": platform_id, "enable": True} for platform_id in platforms])
+    return module.AdvancedWhitelistPlugin(context, AstrBotConfig(config))
+
+
+class _MessageObject:
+    __slots__ = ("raw_message", "timestamp")
+
+    def __init__(self, raw_message, timestamp):
+        self.raw_message = raw_message
+        self.timestamp = timestamp
+
+
+class StubEvent:
+    """模拟 AstrMessageEvent 的最小事件对象"""
+
+    def __init__(self, origin, sender_id, group_id="", message_type="FriendMessage",
+                 raw_message=None, platform_name="aiocqhttp", timestamp=None, message_str="hello"):
+        self.unified_msg_origin = origin
+        self.message_obj = _MessageObject(raw_message, timestamp)
+        self.message_str = message_str
+        self._sender_id = sender_id
+        self._group_id = group_id
+        self._message_type = MessageType(message_type)
+        self._platform_name = platform_name
+        self._result = None
+        self._stopped = False
+
+    def get_message_type(self):
+        return self._message_type
+
+    def get_sender_id(self):
+        return self._sender_id
+
+    def get_group_id(self):
+        return self._group_id
+
+    def get_platform_name(self):
+        return self._platform_name
+
+    def get_session_id(self):
+        return self.unified_msg_origin.split(":", 2)[-1]
+
+    def set_result(self, result):
+        self._result = result
+
+    def get_result(self):
+        return self._result
+
+    def stop_event(self):
+        self._stopped = True
+
+    def is_stopped(self):
+        return self._stopped or (self._result is not None and self._result.is_stopped())
+
+    def reset(self):
+        self._result = None
+        self._stopped = False
+
+
+def run_handler(coro):
+    """同步驱动不含 await 的事件处理协程，避免事件循环调度开销计入测量"""
+    try:
+        coro.send(None)
+    except StopIteration:
+        return
+    coro.close()
+    raise RuntimeError("事件处理器在基准测试中发生了挂起")
@@ -0,0 +1,160 @@
+"""
+白名单过滤器基准测试
+使用桩对象直接驱动 AdvancedWhitelistPlugin.check_whitelist，无需 AstrBot 运行时
+
+覆盖场景：
+- 白名单规模：10 ~ 100k 条
+- 事件构成：好友私聊 / 群聊 / 临时会话 / 请求事件 / 混合
+- 判定缓存：热（少量会话反复出现）/ 冷（缓存关闭且会话各不相同）；以上场景均关闭刷屏保护
+- 刷屏保护：少量会话反复被阻止，达到阈值后直接丢弃
+- 所有开关关闭
+
+运行: python benchmarks/bench_filter.py [--sizes 10,1000,100000] [--events 20000] [--json out.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _stubs import StubEvent, make_plugin, run_handler  # noqa: E402
+
+DEFAULT_SIZES = (10, 1_000, 10_000, 100_000)
+MIXES = ("friend", "group", "temp", "request", "mixed")
+HOT_POOL = 64
+
+
+def build_config(size: int, cache: bool, enabled: bool = True, flood: bool = False) -> dict:
+    """生成 size 条好友/群聊白名单和 size // 10 条全局白名单的配置
+
+    默认关闭刷屏保护，避免热场景中反复出现的被阻止会话被直接丢弃，测不到判定缓存
+    """
+    return {
+        "enable_temp_session_control": enabled,
+        "enable_friend_message_whitelist": enabled,
+        "enable_group_message_whitelist": enabled,
+        "friend_message_whitelist": [str(10_000_000 + i) for i in range(size)],
+        "group_message_whitelist": [str(900_000_000 + i) for i in range(size)],
+        "global_whitelist": [str(20_000_000 + i) for i in range(max(size // 10, 1))],
+        "log_blocked_messages": True,
+        "decision_cache_size": 4096 if cache else 0,
+        "decision_cache_ttl": 300 if cache else 0,
+        "flood_block_threshold": 10 if flood else 0,
+    }
+
+
+def make_event(kind: str, n: int, size: int, now: int) -> StubEvent:
+    """生成第 n 个事件，偶数号命中白名单，奇数号不在白名单中"""
+    hit = n % 2 == 0
+    index = (n // 2) % size if hit else size + n
+    if kind == "friend":
+        user = str(10_000_000 + index)
+        raw = {"post_type": "message", "message_type": "private", "sub_type": "friend", "time": now}
+        return StubEvent(f"aiocqhttp:FriendMessage:{user}", user, raw_message=raw)
+    if kind == "group":
+        group = str(900_000_000 + index)
+        raw = {"post_type": "message", "message_type": "group", "time": now}
+        return StubEvent(f"aiocqhttp:GroupMessage:{group}", str(30_000_000 + n), group,
+                         message_type="GroupMessage", raw_message=raw)
+    if kind == "temp":
+        user = str(40_000_000 + n)
+        raw = {"post_type": "message", "message_type": "private", "sub_type": "group", "time": now}
+        return StubEvent(f"aiocqhttp:FriendMessage:{user}", user, raw_message=raw)
+    if kind == "request":
+        user = str(50_000_000 + n)
+        raw = {"post_type": "request", "request_type": "friend", "time": now}
+        return StubEvent(f"aiocqhttp:FriendMessage:{user}", user, raw_message=raw, message_str="")
+    raise ValueError(kind)
+
+
+def build_events(mix: str, count: int, size: int, hot: bool) -> list:
+    now = int(time.time())
+    distinct = min(HOT_POOL, count) if hot else count
+    kinds = ("friend", "friend", "group", "group", "friend", "group", "friend", "group", "temp", "request") \
+        if mix == "mixed" else (mix,)
+    pool = [make_event(kinds[n % len(kinds)], n, size, now) for n in range(distinct)]
+    return [pool[n % distinct] for n in range(count)]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(int(len(sorted_values) * pct / 100), len(sorted_values) - 1)
+    return sorted_values[k]
+
+
+def measure(plugin, events: list) -> dict:
+    """逐个驱动事件，返回单事件延迟分位数（微秒）和吞吐量"""
+    handler = plugin.check_whitelist
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    # 预热：编译索引、填充缓存
+    for event in events[:min(len(events), 1000)]:
+        event.reset()
+        run_handler(handler(event))
+    total_start = clock()
+    for event in events:
+        event.reset()
+        start = clock()
+        run_handler(handler(event))
+        append(clock() - start)
+    total = clock() - total_start
+    latencies.sort()
+    return {
+        "p50_us": percentile(latencies, 50) / 1000,
+        "p90_us": percentile(latencies, 90) / 1000,
+        "p99_us": percentile(latencies, 99) / 1000,
+        "max_us": latencies[-1] / 1000,
+        "events_per_sec": len(events) / (total / 1e9),
+    }
+
+
+def run(sizes, count: int) -> list:
+    results = []
+
+    def record(name, size, mix, cache, plugin, events):
+        stats = measure(plugin, events)
+        stats.update({"scenario": name, "size": size, "mix": mix, "cache": cache})
+        results.append(stats)
+        print(f"{name:<10} {size:>7} {mix:<8} {cache:<5} "
+              f"{stats['p50_us']:>8.2f} {stats['p90_us']:>8.2f} {stats['p99_us']:>8.2f} "
+              f"{stats['max_us']:>9.1f} {stats['events_per_sec']:>12,.0f}")
+
+    print(f"{'场景':<8} {'规模':>6} {'事件':<7} {'缓存':<4} "
+          f"{'p50(us)':>8} {'p90(us)':>8} {'p99(us)':>8} {'max(us)':>9} {'events/s':>12}")
+    for size in sizes:
+        for mix in MIXES:
+            for hot in (True, False):
+                plugin = make_plugin(build_config(size, cache=hot))
+                events = build_events(mix, count, size, hot)
+                record("filter", size, mix, "hot" if hot else "cold", plugin, events)
+        plugin = make_plugin(build_config(size, cache=True, flood=True))
+        record("flood", size, "mixed", "hot", plugin, build_events("mixed", count, size, hot=True))
+        plugin = make_plugin(build_config(size, cache=True, enabled=False))
+        record("all-off", size, "mixed", "-", plugin, build_events("mixed", count, size, hot=False))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="白名单过滤器基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="白名单规模，逗号分隔")
+    parser.add_argument("--events", type=int, default=20_000, help="每个场景的事件数")
+    parser.add_argument("--json", help="将结果以 JSON 格式写入该文件")
+    args = parser.parse_args()
+
+    logging.getLogger("astrbot").setLevel(logging.WARNING)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run(sizes, args.events)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+白名单ID集合内存与查找开销基准测试
+对比 list[str]（原实现）、frozenset[str] 与 CompactIdSet（有序整数数组）
+
+运行: python benchmarks/bench_idset.py [--sizes 1000,10000,100000,1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from awb_core.idset import CompactIdSet, set_memory_usage  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="白名单ID集合基准测试")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="ID数量，逗号分隔")
+    args = parser.parse_args()
+
+    print(f"{'规模':>8} {'结构':<14} {'总内存(KB)':>11} {'字节/ID':>8} {'命中(ns)':>9} {'未命中(ns)':>10}")
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        rng = random.Random(size)
+        ids = [str(rng.randrange(10_000, 4_000_000_000)) for _ in range(size)]
+        hit = ids[size // 2]
+        miss = "4000000001"
+        structures = {
+            "list[str]": list(ids),
+            "frozenset[str]": frozenset(ids),
+            "CompactIdSet": CompactIdSet(ids),
+        }
+        for name, values in structures.items():
+            memory = set_memory_usage(values)
+            number = 20 if name == "list[str]" else 200_000
+            hit_ns = min(timeit.repeat(lambda: hit in values, number=number, repeat=3)) / number * 1e9
+            miss_ns = min(timeit.repeat(lambda: miss in values, number=number, repeat=3)) / number * 1e9
+            print(f"{size:>8} {name:<14} {memory / 1024:>11,.0f} {memory / size:>8.1f} {hit_ns:>9,.0f} {miss_ns:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
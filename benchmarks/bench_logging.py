@@ -0,0 +1,42 @@
+"""
+调试日志开销基准测试
+对比调试级别关闭时，直接使用 f-string 调用 logger.debug 与使用 LazyLogger 的单次开销
+
+运行: python benchmarks/bench_logging.py
+"""
+
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from awb_core import LazyLogger  # noqa: E402
+
+NUMBER = 200_000
+
+
+def main():
+    logger = logging.getLogger("awb_bench")
+    logger.setLevel(logging.INFO)
+    log = LazyLogger(logger)
+    umo = "aiocqhttp:FriendMessage:123456789"
+    sender = "123456789"
+    whitelist = [str(10_000_000 + i) for i in range(1000)]
+
+    cases = {
+        "f-string logger.debug": lambda: logger.debug(f"[好友私聊检查] 会话: {umo}, 用户ID: {sender}"),
+        "LazyLogger.debug": lambda: log.debug("[好友私聊检查] 会话: %s, 用户ID: %s", umo, sender),
+        "debug_enabled 判断": lambda: log.debug_enabled and log.debug("[好友私聊检查] 会话: %s", umo),
+        "f-string 整个白名单": lambda: logger.debug(f"[好友私聊检查] 白名单内容: {whitelist}"),
+        "LazyLogger 整个白名单": lambda: log.debug("[好友私聊检查] 白名单内容: %s", whitelist),
+    }
+    print(f"调试日志关闭，每项调用 {NUMBER} 次")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+        print(f"  {name:<24} {seconds / NUMBER * 1e9:10.1f} ns/次")
+
+
+if __name__ == "__main__":
+    main()
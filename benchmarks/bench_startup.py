@@ -0,0 +1,204 @@
+"""
+插件启动基准测试
+测量冷启动时间和启动后第一条事件的延迟
+
+覆盖场景：
+- 冷导入：在新的子进程中导入 main.py 的耗时，以及是否加载了 sqlite3 / csv 等只在部分功能中使用的模块
+- 同步构建：没有运行中的事件循环时 __init__ 同步构建全部索引的耗时
+- 后台构建：事件循环中 __init__ 的耗时、索引在后台就绪的耗时、构建期间事件循环的最长停顿
+- 首条事件：索引就绪前到达（等待后台构建完成）与就绪后到达的延迟，以及等待期间事件循环的最长停顿；
+  所有开关关闭时的延迟
+
+运行: python benchmarks/bench_startup.py [--sizes 10000,100000,1000000] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _stubs import StarTools, StubEvent, make_plugin, run_handler  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+IMPORT_RUNS = 5
+# 事件循环停顿的采样间隔（秒）
+TICK = 0.001
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+import _stubs
+_stubs.install()
+start = time.perf_counter()
+_stubs.load_plugin_module()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "sqlite3": "sqlite3" in sys.modules, "csv": "csv" in sys.modules}}))
+"""
+
+
+def build_config(size: int, enabled: bool = True) -> dict:
+    """生成 size 条好友/群聊白名单和 size // 10 条全局白名单的配置"""
+    return {
+        "enable_temp_session_control": enabled,
+        "enable_friend_message_whitelist": enabled,
+        "enable_group_message_whitelist": enabled,
+        "friend_message_whitelist": [str(10_000_000 + i) for i in range(size)],
+        "group_message_whitelist": [str(900_000_000 + i) for i in range(size)],
+        "global_whitelist": [str(20_000_000 + i) for i in range(max(size // 10, 1))],
+        "enable_metrics": False,
+        "persist_feedback_state": False,
+        "log_blocked_messages": False,
+    }
+
+
+def make_event(size: int) -> StubEvent:
+    """命中好友白名单最后一条的私聊事件"""
+    user = str(10_000_000 + size - 1)
+    raw = {"post_type": "message", "message_type": "private", "sub_type": "friend", "time": int(time.time())}
+    return StubEvent(f"aiocqhttp:FriendMessage:{user}", user, raw_message=raw)
+
+
+def first_event_ms(plugin, size: int) -> float:
+    event = make_event(size)
+    start = time.perf_counter()
+    run_handler(plugin.check_whitelist(event))
+    elapsed = (time.perf_counter() - start) * 1000
+    if event.is_stopped():
+        raise RuntimeError("白名单中的事件被阻止，索引构建结果不正确")
+    return elapsed
+
+
+async def early_event_ms(plugin, size: int) -> float:
+    """在事件循环中处理一条事件（索引未就绪时等待后台构建完成）"""
+    event = make_event(size)
+    start = time.perf_counter()
+    await plugin.check_whitelist(event)
+    elapsed = (time.perf_counter() - start) * 1000
+    if event.is_stopped():
+        raise RuntimeError("白名单中的事件被阻止，索引构建结果不正确")
+    return elapsed
+
+
+def measure_import() -> dict:
+    """在新的子进程中导入插件，取多次运行的最小值"""
+    script = _IMPORT_SCRIPT.format(bench_dir=os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(IMPORT_RUNS):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run["ms"])
+    return {"import_ms": best["ms"], "sqlite3_loaded": best["sqlite3"], "csv_loaded": best["csv"]}
+
+
+async def _watch_loop(stop: asyncio.Event) -> float:
+    """每 TICK 秒唤醒一次，返回实际唤醒间隔超出 TICK 的最大值（毫秒）"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TICK)
+        now = time.perf_counter()
+        worst = max(worst, now - last - TICK)
+        last = now
+    return worst * 1000
+
+
+async def measure_background(config: dict, size: int) -> dict:
+    # 索引就绪前到达的事件：等待后台构建完成后判定，同时记录等待期间事件循环的最长停顿
+    # 先回收上一个场景遗留的对象，避免其垃圾回收计入本场景
+    gc.collect()
+    stop = asyncio.Event()
+    watcher = asyncio.get_running_loop().create_task(_watch_loop(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    plugin = make_plugin(config)
+    init_ms = (time.perf_counter() - start) * 1000
+    early_ms = await early_event_ms(plugin, size)
+    stop.set()
+    early_stall_ms = await watcher
+
+    # 索引就绪后到达的事件：等待后台构建完成，同时记录事件循环的最长停顿
+    plugin = None
+    gc.collect()
+    stop = asyncio.Event()
+    watcher = asyncio.get_running_loop().create_task(_watch_loop(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    plugin = make_plugin(config)
+    build = plugin._index_build
+    if build is not None:
+        await build
+    ready_ms = (time.perf_counter() - start) * 1000
+    stop.set()
+    stall_ms = await watcher
+    return {
+        "init_ms": init_ms,
+        "ready_ms": ready_ms,
+        "max_stall_ms": stall_ms,
+        "early_event_ms": early_ms,
+        "early_max_stall_ms": early_stall_ms,
+        "ready_event_ms": first_event_ms(plugin, size),
+    }
+
+
+async def _all_off_event(size: int) -> float:
+    """所有开关关闭：策略计划为空，首条事件不等待索引"""
+    plugin = make_plugin(build_config(size, enabled=False))
+    elapsed = first_event_ms(plugin, size)
+    if plugin._index_build is not None:
+        await plugin._index_build
+    return elapsed
+
+
+def run(sizes) -> dict:
+    imported = measure_import()
+    print(f"冷导入 {imported['import_ms']:.1f} ms"
+          f"（sqlite3 {'已' if imported['sqlite3_loaded'] else '未'}加载，"
+          f"csv {'已' if imported['csv_loaded'] else '未'}加载）")
+    print(f"{'规模':>9} {'同步init(ms)':>13} {'后台init(ms)':>13} {'就绪(ms)':>10} {'最长停顿(ms)':>13} "
+          f"{'就绪前首条(ms)':>15} {'其间停顿(ms)':>13} {'就绪后首条(ms)':>15} {'全关首条(ms)':>13}")
+    results = []
+    for size in sizes:
+        config = build_config(size)
+        gc.collect()
+        start = time.perf_counter()
+        plugin = make_plugin(config)
+        sync_ms = (time.perf_counter() - start) * 1000
+        del plugin
+        stats = asyncio.run(measure_background(config, size))
+        stats.update({"size": size, "sync_init_ms": sync_ms})
+        stats["all_off_event_ms"] = asyncio.run(_all_off_event(size))
+        results.append(stats)
+        print(f"{size:>9,} {sync_ms:>13.1f} {stats['init_ms']:>13.2f} {stats['ready_ms']:>10.1f} "
+              f"{stats['max_stall_ms']:>13.1f} {stats['early_event_ms']:>15.1f} {stats['early_max_stall_ms']:>13.1f} "
+              f"{stats['ready_event_ms']:>15.3f} {stats['all_off_event_ms']:>13.3f}")
+    return {**imported, "sizes": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="插件启动基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="白名单规模，逗号分隔")
+    parser.add_argument("--json", help="将结果以 JSON 格式写入该文件")
+    args = parser.parse_args()
+
+    logging.getLogger("astrbot").setLevel(logging.WARNING)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory(prefix="awb_startup_") as data_dir:
+        # 插件数据目录指向临时目录，不读写真实的数据文件
+        StarTools.data_dir = data_dir
+        results = run(sizes)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,75 @@
 
 import astrbot.api.star as star
 from astrbot.api import AstrBotConfig, logger
-from astrbot.api.event import AstrMessageEvent, MessageEventResult, filter
+from astrbot.api.event import AstrMessageEvent, MessageChain, MessageEventResult, filter
 from astrbot.api.star import Context, Star, register
-from astrbot.core.platform.message_type import MessageType
 from sys import maxsize
-from datetime import datetime, date
+from pathlib import Path
+import asyncio
+import re
 import time
 
+from .awb_core import (
+    ENTRY_SEPARATORS,
+    KIND_FRIEND,
+    KIND_GROUP,
+    SWITCH_KEYS,
+    WATCHED_KEYS,
+    BlockAuditLog,
+    ConfigWatcher,
+    DebouncedSaver,
+    DecisionCache,
+    EntryView,
+    EventDescriptor,
+    ExpiryScheduler,
+    FeedbackJournal,
+    FeedbackLimiter,
+    FeedbackOutbox,
+    FilterMetrics,
+    FloodGuard,
+    LayeredIndex,
+    LazyLogger,
+    PlatformWatcher,
+    SQLiteWhitelistStore,
+    TypePlan,
+    WhitelistIndex,
+    classify_event,
+    compile_policy,
+    compile_whitelist,
+    format_entries,
+    format_expiry,
+    format_summary,
+    is_rule,
+    merge_entries,
+    paginate,
+    parse_entries,
+    parse_expiry,
+    parse_origin,
+)
+
+# 白名单类型 -> 配置键名
+WHITELIST_KEYS = {
+    "friend": "friend_message_whitelist",
+    "group": "group_message_whitelist",
+    "global": "global_whitelist",
+}
+
+# 运行指标导出格式 -> 插件数据目录中的文件名
+METRICS_DUMP_FILES = {
+    "json": "metrics.json",
+    "prometheus": "metrics.prom",
+}
+
+# 黑名单类型 -> 配置键名
+BLACKLIST_KEYS = {
+    "friend": "friend_message_blacklist",
+    "group": "group_message_blacklist",
+    "global": "global_blacklist",
+}
+
+# 策略计划为空（所有检查均未生效）时检测配置变更的间隔（秒）
+IDLE_POLL_INTERVAL = 1.0
+
 
 @register(
     "advanced_whitelist_blacklist",
@@ -26,6 +88,8 @@ class AdvancedWhitelistPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig = None):
         super().__init__(context)
         self.context = context
+        # 调试日志门面：只在加载和配置变更时检查日志级别，调试关闭时不格式化任何字符串
+        self._log = LazyLogger(logger)
         self.config = config
         if self.config is None:
             # 如果没有传入 config，尝试从 metadata 获取
@@ -39,13 +103,123 @@ class AdvancedWhitelistPlugin(Star):
             from astrbot.core.config.astrbot_config import AstrBotConfig
             self.config = AstrBotConfig({}, {})
         
-        # 获取平台ID列表（用于匹配）
-        self.platform_ids = self._get_platform_ids()
-        # 频率控制：记录每天每个会话的第一次反馈时间
-        # key: unified_msg_origin, value: date (今天的日期)
-        self._daily_feedback_cache = {}
-        logger.info(f"高级白名单插件已加载，检测到平台ID: {self.platform_ids}")
+        # 平台ID列表（用于匹配），由 _refresh_indexes 在首次检测配置时读取
+        self.platform_ids = []
+        # 频率控制：记录今天已发送过反馈的会话，跨天整批过期，条目数有上限
+        self._feedback_limiter = FeedbackLimiter(
+            maxsize=self.config.get("feedback_cache_max_size", 10000)
+        )
+        # 反馈消息在加载配置时一次性生成，key: 反馈类别, value: MessageChain（文本为空时为 None，静默阻止）
+        self._feedback_messages = {
+            "temp": self._render_feedback("temp_session_feedback", "珈宝也想和你玩，但是要经过姐姐同意哦"),
+            "friend": self._render_feedback("friend_message_feedback", "要先经过姐姐同意哦"),
+        }
+        # 反馈发送队列：反馈在后台按全局速率上限发送，同一会话合并，事件处理路径上只做一次入队
+        self._feedback_outbox = FeedbackOutbox(
+            self._deliver_feedback,
+            maxsize=self.config.get("feedback_queue_size", 200),
+            rate=self.config.get("feedback_rate_limit", 2.0),
+            logger=logger,
+        )
+        # 配置延迟写入：管理命令的修改在合并窗口后于线程池中保存一次，插件停用时确保写入
+        self._config_saver = DebouncedSaver(
+            self.config.save_config,
+            delay=self.config.get("config_save_debounce", 1.0),
+            logger=logger,
+        )
+        # 拦截日志：被阻止的消息按会话计数，由后台任务周期性汇总输出
+        self._audit_log = BlockAuditLog(
+            logger,
+            interval=self.config.get("blocked_log_interval", 60),
+            jsonl_path=self._get_data_dir() / "blocked_messages.jsonl" if self.config.get("blocked_log_jsonl", False) else None,
+        )
+        # 可选：将频率控制状态持久化到插件数据目录，重启后不会重复发送反馈
+        self._feedback_journal = None
+        if self.config.get("persist_feedback_state", False):
+            self._feedback_journal = FeedbackJournal(self._get_data_dir() / "feedback_state.log")
+        # /awb list 前缀搜索用的排序视图，key: 配置键名, value: EntryView
+        self._list_views = {}
+        # 白名单预编译索引，key: 配置键名, value: WhitelistIndex
+        self._whitelist_indexes = {}
+        # 可选：超大白名单保存在插件数据目录的 SQLite 存储中，配置中的列表作为覆盖层叠加
+        self._whitelist_store = None
+        if self.config.get("use_external_store", False):
+            try:
+                self._whitelist_store = SQLiteWhitelistStore(self._get_data_dir() / "whitelist.db")
+            except Exception as e:
+                logger.warning(f"打开外部白名单存储失败，将只使用配置中的白名单: {e}")
+        # 配置变更检测：白名单或 platform_ids 变更时才重建索引
+        self._config_watcher = ConfigWatcher(self.config, WATCHED_KEYS + SWITCH_KEYS)
+        # 平台变更检测：适配器启用/停用后按新的平台列表重建索引（节流检查）
+        self._platform_watcher = PlatformWatcher(lambda: self.context.get_config().get("platform", []))
+        # 策略计划：每种消息类型最少需要执行的检查，配置变更时重新编译。
+        # 索引构建完成前先按配置中的列表（及外部存储中的条目数）编译：列表为空时索引必为空，
+        # 所有开关关闭或名单为空时无需等待索引
+        self._policy_plan = compile_policy(self.config, {
+            config_key: self.config.get(config_key) or (
+                self._whitelist_store is not None and config_key in WHITELIST_KEYS.values()
+                and self._whitelist_store.count(config_key)
+            )
+            for config_key in WATCHED_KEYS
+        })
+        # 策略计划为空时下一次检测配置变更的时间（time.monotonic）
+        self._next_idle_poll = 0.0
+        # 索引后台构建任务，完成后为 None
+        self._index_build = None
+        # 索引构建统计：最近一次构建的耗时、条目数和方式，通过 /awb stats 查看
+        self._index_build_stats = {}
+        # 刷屏保护：同一会话的同一发送者短时间内被多次阻止后，后续消息在进入过滤逻辑前直接丢弃
+        self._flood_guard = FloodGuard(
+            threshold=self.config.get("flood_block_threshold", 10),
+            window=self.config.get("flood_block_window", 60),
+        )
+        # 判定缓存：按 (会话, 发送者, 群, 消息类型) 缓存白名单命中结果
+        self._decision_cache = DecisionCache(
+            maxsize=self.config.get("decision_cache_size", 4096),
+            ttl=self.config.get("decision_cache_ttl", 300),
+        )
+        # 运行指标：事件计数、判定结果、单事件耗时和缓存命中率，通过 /awb stats 查看
+        self._metrics = None
+        if self.config.get("enable_metrics", True):
+            dump_format = self.config.get("metrics_dump_format", "")
+            self._metrics = FilterMetrics(
+                collect=self._collect_cache_stats,
+                dump_path=self._get_data_dir() / METRICS_DUMP_FILES[dump_format] if dump_format in METRICS_DUMP_FILES else None,
+                dump_format=dump_format,
+                dump_interval=self.config.get("metrics_dump_interval", 60),
+            )
+        # 限时条目：到期时间保存在插件数据目录，由后台任务在到期时批量移除，匹配时不检查时间
+        self._expiry = ExpiryScheduler(self._get_data_dir() / "expiry.json", on_expire=self._expire_entries)
+        self._expiry_saver = DebouncedSaver(
+            self._expiry.save,
+            delay=self.config.get("config_save_debounce", 1.0),
+            logger=logger,
+        )
+        try:
+            self._expiry.load()
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取限时条目到期时间失败: {e}")
+        # 条目已在命令之外（如 WebUI）被删除时，丢弃遗留的到期时间，避免同名条目重新加入后被误删
+        if self._expiry.prune(lambda config_key: self.config.get(config_key, [])):
+            self._expiry_saver.mark_dirty()
+        # 插件停用期间已到期的条目在首次构建索引前移除
+        self._expire_entries(self._expiry.pop_due(), refresh=False)
+        self._expiry.start()
+        # 索引在后台构建，插件立即完成加载；构建完成前到达的需要匹配名单的事件等待构建完成
+        self._start_index_build()
+        logger.info("高级白名单插件已加载")
     
+    def _get_data_dir(self) -> Path:
+        """获取插件数据目录（data/plugin_data/astrbot_plugin_whitelistpro）"""
+        try:
+            from astrbot.api.star import StarTools
+            return Path(StarTools.get_data_dir("astrbot_plugin_whitelistpro"))
+        except Exception as e:
+            logger.debug(f"无法通过 StarTools 获取插件数据目录: {e}")
+        data_dir = Path("data") / "plugin_data" / "astrbot_plugin_whitelistpro"
+        data_dir.mkdir(parents=True, exist_ok=True)
+        return data_dir
+
     def _get_platform_ids(self) -> list:
         """获取平台ID列表，优先从配置读取，否则使用用户配置的列表"""
         # 首先尝试从配置中读取
@@ -71,104 +245,270 @@ class AdvancedWhitelistPlugin(Star):
         logger.warning("未找到平台ID配置，纯数字输入可能无法正确匹配。请在插件配置中填入 platform_ids")
         return []
 
-    def _match_whitelist(self, whitelist: list, user_id: str = None, group_id: str = None, 
-                        unified_msg_origin: str = None) -> bool:
-        """检查是否在白名单中，支持多种格式匹配
+    def _detect_changes(self) -> tuple:
+        """检测白名单、平台和开关配置变更，返回 (变更的配置键, 需要重建索引的配置键)"""
+        if self._platform_watcher.poll():
+            self._config_watcher.invalidate("platform_ids")
+        changed = self._config_watcher.poll()
+        if not changed:
+            return changed, ()
+        if "platform_ids" in changed:
+            # 纯ID条目按平台列表展开，平台变更后所有白名单、黑名单索引都要重建
+            self.platform_ids = self._get_platform_ids()
+            return changed, (*WHITELIST_KEYS.values(), *BLACKLIST_KEYS.values())
+        return changed, tuple(config_key for config_key in changed if config_key in WATCHED_KEYS)
+
+    @staticmethod
+    def _compile_indexes(lists: dict, platform_ids: list, compact_threshold: int) -> dict:
+        """编译各名单的索引（不访问插件状态，可在线程池中执行）"""
+        return {
+            config_key: compile_whitelist(items, platform_ids, compact_threshold)
+            for config_key, items in lists.items()
+        }
+
+    def _install_indexes(self, changed: tuple, indexes: dict):
+        """替换编译好的索引，并重新编译策略计划"""
+        for config_key, index in indexes.items():
+            if index.rules is not None:
+                for rule, reason in index.rules.errors:
+                    logger.warning(f"[{config_key}] 白名单规则无效，已忽略: {rule}（{reason}）")
+            if self._whitelist_store is not None and config_key in WHITELIST_KEYS.values():
+                index = LayeredIndex(index, self._whitelist_store, config_key)
+            self._whitelist_indexes[config_key] = index
+        self._policy_plan = compile_policy(self.config, self._whitelist_indexes)
+        self._decision_cache.clear()
+        self._flood_guard.clear()
+        self._log.refresh()
+        self._log.debug("[白名单索引] 配置已变更，重建索引: %s（代数: %s），策略计划: %s", changed, self._config_watcher.generation, self._policy_plan)
+
+    def _record_index_build(self, mode: str, lists: dict, start: float):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._index_build_stats = {
+            "mode": mode,
+            "entries": sum(len(items) for items in lists.values()),
+            "build_ms": round(elapsed_ms, 2),
+        }
+        return elapsed_ms
+
+    def _start_index_build(self):
+        """在后台线程中构建索引；没有运行中的事件循环（离线工具、基准测试）时同步构建"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._refresh_indexes()
+            return
+        self._index_build = loop.create_task(self._build_indexes_in_background())
+
+    async def _build_indexes_in_background(self):
+        start = time.perf_counter()
+        changed, rebuild = self._detect_changes()
+        # 在事件循环线程中复制列表，线程池中编译时管理命令修改配置不会影响本次构建
+        lists = {config_key: list(self.config.get(config_key, [])) for config_key in rebuild}
+        try:
+            indexes = await asyncio.get_running_loop().run_in_executor(
+                None, self._compile_indexes, lists, list(self.platform_ids), self.config.get("compact_id_threshold", 0)
+            )
+        except Exception as e:
+            logger.warning(f"后台构建白名单索引失败，将在处理消息时同步构建: {e}")
+            self._config_watcher.invalidate()
+            self._index_build = None
+            return
+        self._index_build = None
+        self._install_indexes(changed, indexes)
+        elapsed_ms = self._record_index_build("background", lists, start)
+        logger.info(f"白名单索引已在后台构建完成（{self._index_build_stats['entries']} 条，耗时 {elapsed_ms:.1f} ms），平台ID: {self.platform_ids}")
+        # 构建期间管理命令或 WebUI 对名单的修改在此补上
+        self._refresh_indexes()
+
+    async def _wait_for_indexes(self, event: AstrMessageEvent):
+        """索引后台构建期间，需要匹配名单的事件等待构建完成（不阻塞事件循环，不需要名单的事件直接处理）"""
+        if event.get_message_type().value not in self._policy_plan.by_type:
+            return
+        build = self._index_build
+        try:
+            # shield：等待中的事件被取消时不影响后台构建
+            await asyncio.shield(build)
+        except asyncio.CancelledError:
+            if not build.cancelled():
+                raise
+
+    def _refresh_indexes(self):
+        """检测白名单、平台和开关配置变更，只重建发生变更的索引，并重新编译策略计划
+
+        后台构建索引期间不做任何处理：构建完成后会再次调用本方法，补上构建期间的配置变更
+        """
+        if self._index_build is not None:
+            return
+        start = time.perf_counter()
+        changed, rebuild = self._detect_changes()
+        if not changed:
+            return
+        lists = {config_key: self.config.get(config_key, []) for config_key in rebuild}
+        self._install_indexes(changed, self._compile_indexes(
+            lists, self.platform_ids, self.config.get("compact_id_threshold", 0)
+        ))
+        if not self._index_build_stats:
+            elapsed_ms = self._record_index_build("sync", lists, start)
+            logger.info(f"白名单索引已同步构建完成（{self._index_build_stats['entries']} 条，耗时 {elapsed_ms:.1f} ms），平台ID: {self.platform_ids}")
+
+    def _poll_while_inactive(self) -> bool:
+        """策略计划为空时每 IDLE_POLL_INTERVAL 秒检测一次配置变更，返回策略计划是否已变为生效"""
+        now = time.monotonic()
+        if now < self._next_idle_poll:
+            return False
+        self._next_idle_poll = now + IDLE_POLL_INTERVAL
+        self._refresh_indexes()
+        return self._policy_plan.active
+
+    def _on_whitelist_changed(self, config_key: str, save: bool = True):
+        """白名单被管理命令修改后调用：保存配置（延迟写入）并立即重建索引"""
+        if save:
+            self._config_saver.mark_dirty()
+        self._config_watcher.invalidate(config_key)
+        self._refresh_indexes()
+
+    def _expire_entries(self, due: dict, refresh: bool = True):
+        """批量移除到期的条目：所有名单合并为一次索引重建，配置和到期时间各保存一次"""
+        if not due:
+            return
+        try:
+            removed = []
+            for config_key, entries in due.items():
+                expired = set(entries)
+                current = self.config.get(config_key, [])
+                remaining = [entry for entry in current if entry not in expired]
+                if len(remaining) != len(current):
+                    self.config[config_key] = remaining
+                    self._config_watcher.invalidate(config_key)
+                    removed.extend(f"[{config_key}] {entry}" for entry in current if entry in expired)
+            self._expiry_saver.mark_dirty()
+            if removed:
+                self._config_saver.mark_dirty()
+                if refresh:
+                    self._refresh_indexes()
+                logger.info(f"已移除 {len(removed)} 条到期的名单条目: {', '.join(removed[:20])}{' ...' if len(removed) > 20 else ''}")
+        except Exception as e:
+            logger.warning(f"移除到期的名单条目失败: {e}")
+
+    def _update_expiry(self, config_key: str, entry: str, expires_at) -> str:
+        """设置（expires_at 不为 None）或取消条目的到期时间，返回附加在回复中的说明"""
+        if expires_at is not None:
+            self._expiry.schedule(config_key, entry, expires_at)
+            note = f"（有效期至 {format_expiry(expires_at)}）"
+        elif self._expiry.cancel(config_key, entry):
+            note = "（已改为永久有效）"
+        else:
+            return ""
+        self._expiry_saver.mark_dirty()
+        return note
+
+    def _parse_expiry_arg(self, event: AstrMessageEvent, expiry: str):
+        """解析命令中的有效期参数，返回 (是否有效, 到期时间或 None)；无效时设置错误回复"""
+        if not expiry:
+            return True, None
+        try:
+            return True, parse_expiry(expiry)
+        except ValueError as e:
+            event.set_result(MessageEventResult().message(str(e)))
+            return False, None
+
+    def _get_whitelist_index(self, config_key: str) -> WhitelistIndex:
+        """获取配置键对应的白名单索引"""
+        return self._whitelist_indexes[config_key]
+
+    def _match_whitelist(self, index: WhitelistIndex, desc: EventDescriptor, match_group: bool = True) -> bool:
+        """检查是否在白名单（或黑名单）中，支持多种格式匹配
         
         匹配逻辑：
         1. 直接匹配完整的 unified_msg_origin（如 qq:FriendMessage:12345678）
         2. 匹配用户ID（QQ号），适用于私聊
         3. 匹配群ID（QQ群号），适用于群聊
-        4. 匹配带前缀的格式（如 qq:FriendMessage:12345678），提取ID部分匹配
-        5. 对于纯数字输入，从 unified_msg_origin 中解析 platform_id 和 message_type，然后匹配
+        4. 匹配带前缀的格式（如 qq:FriendMessage:12345678），只在同一平台上匹配用户ID或群ID
+        5. 对于纯数字输入，只在 platform_ids 中的平台上匹配（未配置任何平台时不限平台）
+        
+        白名单已按平台预编译为 WhitelistIndex，匹配只需常数次集合查找
         """
-        if not whitelist:
+        if not index:
             return False
         
-        user_id = str(user_id).strip() if user_id else None
-        group_id = str(group_id).strip() if group_id else None
-        
-        # 解析 unified_msg_origin 获取平台ID和消息类型
-        platform_id = None
-        message_type = None
-        session_id_from_origin = None
-        if unified_msg_origin:
-            try:
-                parts = unified_msg_origin.split(":")
-                if len(parts) >= 3:
-                    platform_id = parts[0]
-                    message_type = parts[1]
-                    session_id_from_origin = parts[2]
-            except Exception:
-                pass
-        
-        for item in whitelist:
-            item = str(item).strip()
-            if not item:
-                continue
-            
-            # 1. 直接匹配完整会话ID
-            if unified_msg_origin and item == unified_msg_origin:
-                return True
-            
-            # 2. 匹配用户ID（QQ号）- 适用于私聊
-            if user_id and item == user_id:
-                return True
-            
-            # 3. 匹配群ID（QQ群号）- 适用于群聊
-            if group_id and item == group_id:
-                return True
-            
-            # 4. 匹配带前缀的格式（如 qq:FriendMessage:12345678）
-            if ":" in item:
-                try:
-                    parts = item.split(":")
-                    if len(parts) >= 3:
-                        # 提取ID部分进行匹配
-                        item_id = parts[-1]
-                        # 匹配用户ID
-                        if user_id and item_id == user_id:
-                            return True
-                        # 匹配群ID
-                        if group_id and item_id == group_id:
-                            return True
-                        # 如果 session_id_from_origin 存在，也尝试匹配
-                        if session_id_from_origin and item_id == session_id_from_origin:
-                            return True
-                except Exception:
-                    pass
-            else:
-                # 5. 纯数字输入，直接匹配 session_id、user_id 和 group_id
-                # unified_msg_origin 格式为 platform_id:message_type:session_id
-                # 对于私聊，session_id 通常是用户ID
-                # 对于群聊，session_id 可能是群号，也可能是 user_id_group_id（如果 unique_session 开启）
-                # 因此我们需要同时匹配 user_id、group_id 和 session_id_from_origin
-                # 这样无论用户输入的是QQ号还是群号，都能正确匹配
-                if session_id_from_origin and item == session_id_from_origin:
-                    return True
-                # 匹配 user_id（适用于私聊，或者 unique_session 开启时的群聊）
-                if user_id and item == user_id:
-                    return True
-                # 匹配 group_id（适用于群聊，即使 unique_session 开启，group_id 也是独立的）
-                if group_id and item == group_id:
-                    return True
-        
-        return False
+        return index.match(
+            desc.sender_id,
+            desc.group_id if match_group else None,
+            desc.origin,
+            desc.session_id,
+            desc.platform_id
+        )
 
-    def _check_global_whitelist(self, event: AstrMessageEvent) -> bool:
+    def _check_global_whitelist(self, desc: EventDescriptor) -> bool:
         """检查是否在全局白名单中"""
-        global_whitelist = self.config.get("global_whitelist", [])
+        global_whitelist = self._get_whitelist_index("global_whitelist")
         if not global_whitelist:
             return False
         
-        return self._match_whitelist(
-            global_whitelist,
-            user_id=event.get_sender_id(),
+        return self._match_whitelist(global_whitelist, desc)
+
+    def _compute_membership(self, desc: EventDescriptor, type_plan: TypePlan) -> tuple:
+        """按策略计划一次性计算名单命中结果
+
+        依次检查全局白名单、type_plan 中的黑名单和白名单，命中优先级更高的名单后不再检查后面的名单
+
+        返回:
+            (是否在全局白名单中, 是否在黑名单中, 是否在 type_plan.list_key 对应的白名单中)
+        """
+        if self._check_global_whitelist(desc):
+            return (True, False, False)
+        for blacklist_key in type_plan.blacklist_keys:
+            if self._match_whitelist(
+                self._get_whitelist_index(blacklist_key),
+                desc,
+                match_group=blacklist_key != "friend_message_blacklist"
+            ):
+                return (False, True, False)
+        list_key = type_plan.list_key
+        if list_key is None:
+            return (False, False, False)
+        return (False, False, self._match_whitelist(
+            self._get_whitelist_index(list_key),
+            desc,
+            match_group=list_key == "group_message_whitelist"
+        ))
+
+    def _get_membership(self, desc: EventDescriptor, type_plan: TypePlan) -> tuple:
+        """获取名单命中结果，优先读取判定缓存
+
+        命中结果只取决于会话、发送者、群和策略计划（消息类型及需要检查的名单），名单配置变更时缓存会被清空。
+        请求事件和临时会话的识别依赖每条消息的原始数据，不参与缓存。
+        """
+        cache = self._decision_cache
+        if not cache.enabled:
+            return self._compute_membership(desc, type_plan)
+        key = (desc.origin, desc.sender_id, desc.group_id, type_plan)
+        membership = cache.get(key)
+        if membership is None:
+            membership = self._compute_membership(desc, type_plan)
+            cache.put(key, membership)
+        return membership
+
+    def _classify_event(self, event: AstrMessageEvent) -> EventDescriptor:
+        """读取一次事件原始数据，生成供所有检查共用的事件描述"""
+        message_obj = event.message_obj
+        return classify_event(
+            event.get_message_type().value,
+            event.get_platform_name(),
+            event.unified_msg_origin,
+            sender_id=event.get_sender_id(),
             group_id=event.get_group_id(),
-            unified_msg_origin=event.unified_msg_origin
+            raw_message=getattr(message_obj, "raw_message", None),
+            timestamp=getattr(message_obj, "timestamp", None),
         )
 
-    def _is_historical_message(self, event: AstrMessageEvent) -> bool:
+    @staticmethod
+    def _is_request_event(event: AstrMessageEvent) -> bool:
+        """是否为请求事件（好友申请、群聊邀请等），判断方式与 classify_event 相同"""
+        raw = getattr(event.message_obj, "raw_message", None)
+        return isinstance(raw, dict) and raw.get("post_type", "") == "request"
+
+    def _is_historical_message(self, desc: EventDescriptor) -> bool:
         """检查消息是否为历史消息
         
         如果消息时间戳与当前时间相差超过5分钟，认为是历史消息
@@ -177,39 +517,31 @@ class AdvancedWhitelistPlugin(Star):
             True: 是历史消息
             False: 是新消息
         """
+        message_timestamp = desc.timestamp
+        if message_timestamp is None:
+            # 如果无法获取时间戳，假设是新消息
+            self._log.debug("[历史消息检查] 无法获取消息时间戳，假设为新消息")
+            return False
+        
         try:
-            # 获取消息时间戳
-            message_timestamp = getattr(event.message_obj, "timestamp", None)
-            if message_timestamp is None:
-                # 如果没有时间戳，尝试从 raw_message 中获取
-                raw_msg = getattr(event.message_obj, "raw_message", None)
-                if raw_msg and isinstance(raw_msg, dict):
-                    message_timestamp = raw_msg.get("time")
-                
-            if message_timestamp is None:
-                # 如果仍然无法获取时间戳，假设是新消息
-                logger.debug(f"[历史消息检查] 无法获取消息时间戳，假设为新消息")
-                return False
-            
             # 获取当前时间戳
             current_timestamp = int(time.time())
             
             # 计算时间差（秒）
             time_diff = current_timestamp - int(message_timestamp)
-            
-            # 如果时间差超过5分钟（300秒），认为是历史消息
-            if time_diff > 300:
-                logger.debug(f"[历史消息检查] 检测到历史消息，时间差: {time_diff}秒，消息时间戳: {message_timestamp}, 当前时间戳: {current_timestamp}")
-                return True
-            
-            logger.debug(f"[历史消息检查] 新消息，时间差: {time_diff}秒")
-            return False
-            
         except Exception as e:
-            logger.debug(f"[历史消息检查] 检查历史消息时出错: {e}，假设为新消息")
+            self._log.debug("[历史消息检查] 检查历史消息时出错: %s，假设为新消息", e)
             return False
+        
+        # 如果时间差超过5分钟（300秒），认为是历史消息
+        if time_diff > 300:
+            self._log.debug("[历史消息检查] 检测到历史消息，时间差: %s秒，消息时间戳: %s, 当前时间戳: %s", time_diff, message_timestamp, current_timestamp)
+            return True
+        
+        self._log.debug("[历史消息检查] 新消息，时间差: %s秒", time_diff)
+        return False
     
-    def _should_send_feedback(self, event: AstrMessageEvent) -> bool:
+    def _should_send_feedback(self, desc: EventDescriptor, is_historical: bool) -> bool:
         """检查是否应该发送反馈（每天第一次，且仅限新消息）
         
         返回:
@@ -217,109 +549,48 @@ class AdvancedWhitelistPlugin(Star):
             False: 不应该发送反馈（今天已经发送过，或者是历史消息）
         """
         # 首先检查是否为历史消息
-        if self._is_historical_message(event):
-            logger.debug(f"[频率控制] 消息是历史消息，不发送反馈")
+        if is_historical:
+            self._log.debug("[频率控制] 消息是历史消息，不发送反馈")
             return False
         
-        today = date.today()
-        umo = event.unified_msg_origin
+        umo = desc.origin
+        journal = self._feedback_journal
+        if journal is not None and not journal.loaded:
+            self._load_feedback_state()
         
-        # 检查今天是否已经发送过反馈
-        cached_date = self._daily_feedback_cache.get(umo)
-        if cached_date == today:
-            logger.debug(f"[频率控制] 会话 {umo} 今天已发送过反馈，跳过")
+        # 检查今天是否已经发送过反馈（跨天时旧记录整批过期）
+        if umo in self._feedback_limiter:
+            self._log.debug("[频率控制] 会话 %s 今天已发送过反馈，跳过", umo)
             return False  # 今天已经发送过，不重复发送
         
-        # 如果缓存中的日期不是今天（可能是旧日期或不存在），需要更新
-        # 同时清理旧缓存条目（避免内存泄漏）
-        if cached_date is not None and cached_date != today:
-            # 清理旧的缓存条目
-            if umo in self._daily_feedback_cache:
-                del self._daily_feedback_cache[umo]
-                logger.debug(f"[频率控制] 清理过期缓存条目: {umo} (日期: {cached_date})")
+        if not self._feedback_limiter.should_send(umo):
+            self._log.debug("[频率控制] 今天已记录的会话数达到上限 %s，不再发送反馈: %s", self._feedback_limiter.maxsize, umo)
+            return False
         
-        logger.debug(f"[频率控制] 会话 {umo} 今天第一次且是新消息，将发送反馈（上次反馈日期: {cached_date}）")
+        self._log.debug("[频率控制] 会话 %s 今天第一次且是新消息，将发送反馈", umo)
         return True
     
-    def _mark_feedback_sent(self, event: AstrMessageEvent):
-        """标记已发送反馈（只有在实际发送反馈消息时才调用）"""
-        today = date.today()
-        umo = event.unified_msg_origin
-        self._daily_feedback_cache[umo] = today
-        logger.debug(f"[频率控制] 已标记会话 {umo} 今天已发送反馈")
-    
-    def _is_request_event(self, event: AstrMessageEvent) -> bool:
-        """判断是否为请求事件（好友申请、群聊邀请等）
-        
-        请求事件的特征：
-        1. raw_message中的post_type是"request"
-        2. message_str为空字符串
-        """
-        raw_msg = getattr(event.message_obj, "raw_message", None)
-        if raw_msg and isinstance(raw_msg, dict):
-            post_type = raw_msg.get("post_type", "")
-            if post_type == "request":
-                return True
-        
-        # 如果message_str为空，且不是正常的消息，可能是请求事件
-        if not event.message_str or event.message_str.strip() == "":
-            raw_msg = getattr(event.message_obj, "raw_message", None)
-            if raw_msg and isinstance(raw_msg, dict):
-                post_type = raw_msg.get("post_type", "")
-                if post_type == "request":
-                    return True
-        
-        return False
-    
-    def _is_temporary_session(self, event: AstrMessageEvent) -> bool:
-        """判断是否为临时会话的私聊消息
-        
-        排除请求事件（好友申请、群聊邀请），只识别临时会话的私聊消息。
-        
-        对于QQ平台（aiocqhttp），临时会话的识别方式：
-        1. 消息类型为OTHER_MESSAGE（排除请求事件）
-        2. 或者消息类型为FRIEND_MESSAGE，但raw_message中的sub_type不是"friend"（排除请求事件）
-        """
-        # 先排除请求事件（好友申请、群聊邀请）
-        if self._is_request_event(event):
-            logger.debug(f"[临时会话识别] 检测到请求事件，跳过: {event.unified_msg_origin}")
-            return False
-        
-        message_type = event.get_message_type()
-        
-        # 如果消息类型是OTHER_MESSAGE，且不是请求事件，可能是临时会话
-        if message_type == MessageType.OTHER_MESSAGE:
-            # 再次确认不是请求事件
-            if not self._is_request_event(event):
-                return True
-        
-        # 对于QQ平台（aiocqhttp），检查raw_message中的sub_type
-        if event.get_platform_name() == "aiocqhttp" and message_type == MessageType.FRIEND_MESSAGE:
-            raw_msg = getattr(event.message_obj, "raw_message", None)
-            if raw_msg and isinstance(raw_msg, dict):
-                post_type = raw_msg.get("post_type", "")
-                # 排除请求事件
-                if post_type == "request":
-                    return False
-                
-                sub_type = raw_msg.get("sub_type", "")
-                message_type_str = raw_msg.get("message_type", "")
-                # 如果是private消息且sub_type存在且不是"friend"，可能是临时会话
-                if message_type_str == "private":
-                    if sub_type and sub_type != "friend":
-                        logger.debug(f"[临时会话识别] 检测到临时会话，sub_type: {sub_type}, 会话: {event.unified_msg_origin}")
-                        return True
-                    # 如果sub_type为空或"friend"，但session_id格式可能是临时会话格式
-                    # QQ临时会话的session_id通常是群号，而不是QQ号
-                    session_id = event.get_session_id()
-                    # 如果session_id是数字且长度较长（可能是群号），可能是临时会话
-                    # 但更准确的方式是检查sub_type
-                    if not sub_type or sub_type == "":
-                        logger.debug(f"[临时会话识别] private消息但sub_type为空，可能是临时会话，会话: {event.unified_msg_origin}")
-        
-        return False
+    def _mark_feedback_sent(self, desc: EventDescriptor):
+        """标记已发送反馈（只有在反馈消息放入发送队列后才调用）"""
+        umo = desc.origin
+        self._feedback_limiter.mark_sent(umo)
+        if self._feedback_journal is not None:
+            self._feedback_journal.record(self._feedback_limiter.day.isoformat(), umo)
+        self._log.debug("[频率控制] 已标记会话 %s 今天已发送反馈", umo)
+
+    def _load_feedback_state(self):
+        """首次需要时从持久化日志恢复今天已发送过反馈的会话"""
+        try:
+            keys = self._feedback_journal.load(self._feedback_limiter.day.isoformat())
+        except Exception as e:
+            logger.warning(f"读取反馈频率控制状态失败: {e}")
+            return
+        for key in keys:
+            self._feedback_limiter.mark_sent(key)
+        if keys:
+            logger.info(f"已恢复 {len(keys)} 个今天已发送过反馈的会话")
     
-    def _check_temp_session(self, event: AstrMessageEvent) -> bool:
+    def _check_temp_session(self, event: AstrMessageEvent, desc: EventDescriptor) -> bool:
         """检查临时会话控制
         
         返回:
@@ -327,121 +598,122 @@ class AdvancedWhitelistPlugin(Star):
             False: 已阻止
         """
         enable_control = self.config.get("enable_temp_session_control", False)
-        logger.debug(f"[临时会话检查] 控制开关: {enable_control}, 会话: {event.unified_msg_origin}")
+        self._log.debug("[临时会话检查] 控制开关: %s, 会话: %s", enable_control, desc.origin)
         
         if not enable_control:
-            logger.debug(f"[临时会话检查] 控制未启用，允许通过")
+            self._log.debug("[临时会话检查] 控制未启用，允许通过")
             return True  # 未启用控制，允许通过
         
         # 临时会话控制仅作为开关，直接阻止
-        if self.config.get("log_blocked_messages", True):
-            logger.info(f"临时会话 {event.unified_msg_origin} 被阻止（临时会话控制已启用）")
+        self._record_blocked(event, desc, "temp")
+        self._block_with_feedback(event, desc, "temp", "[临时会话检查]")
+        return False
+
+    def _render_feedback(self, config_key: str, default: str):
+        """生成反馈消息，文本为空时返回 None（静默阻止）"""
+        text = str(self.config.get(config_key, default) or "").strip()
+        return MessageChain().message(text) if text else None
+
+    def _block_with_feedback(self, event: AstrMessageEvent, desc: EventDescriptor, kind: str, tag: str):
+        """阻止消息，每天第一次且是新消息时将反馈放入发送队列（不等待发送）"""
+        event.stop_event()
+        message = self._feedback_messages.get(kind)
+        if message is None:
+            return
         
         # 检查是否应该发送反馈（每天第一次，且仅限新消息）
-        should_send = self._should_send_feedback(event)
-        
-        if should_send:
-            # 每天第一次且是新消息：发送反馈消息
-            logger.debug(f"[临时会话检查] 发送反馈消息（每天第一次且是新消息）")
-            # 标记已发送反馈
-            self._mark_feedback_sent(event)
-            # 设置消息结果并停止事件
-            event.set_result(
-                MessageEventResult().message("珈宝也想和你玩，但是要经过姐姐同意哦").stop_event()
-            )
-        else:
+        is_historical = self._is_historical_message(desc)
+        if not self._should_send_feedback(desc, is_historical):
             # 后续消息或历史消息：静默阻止
-            is_historical = self._is_historical_message(event)
             if is_historical:
-                logger.debug(f"[临时会话检查] 历史消息，静默阻止（不发送反馈）")
+                self._log.debug("%s 历史消息，静默阻止（不发送反馈）", tag)
             else:
-                logger.debug(f"[临时会话检查] 今天已发送过反馈，静默阻止")
-            event.stop_event()
+                self._log.debug("%s 今天已发送过反馈，静默阻止", tag)
+            return
         
-        return False
+        if self._feedback_outbox.offer(desc.origin, message):
+            # 每天第一次且是新消息：反馈已放入发送队列，标记已发送反馈
+            self._log.debug("%s 反馈消息已放入发送队列（每天第一次且是新消息）", tag)
+            self._mark_feedback_sent(desc)
+        else:
+            self._log.debug("%s 反馈发送队列已满，静默阻止", tag)
+
+    async def _deliver_feedback(self, origin: str, message: MessageChain):
+        """反馈发送队列的发送函数"""
+        if not await self.context.send_message(origin, message):
+            raise RuntimeError("未找到对应的平台适配器")
+        if self._metrics is not None:
+            self._metrics.feedback_sent += 1
+
+    def _record_blocked(self, event: AstrMessageEvent, desc: EventDescriptor, category: str):
+        """记录一次阻止：计入拦截日志，并计入刷屏保护计数"""
+        if self.config.get("log_blocked_messages", True):
+            self._audit_log.record(category, desc.origin)
+        if self._flood_guard.record_block((event.unified_msg_origin, event.get_sender_id())):
+            logger.info(
+                f"会话 {desc.origin} 的发送者 {desc.sender_id} 在 {self._flood_guard.window:g} 秒内被阻止 "
+                f"{self._flood_guard.threshold} 次，窗口结束前的后续消息将被直接丢弃"
+            )
+
+    def _block_blacklisted(self, event: AstrMessageEvent, desc: EventDescriptor):
+        """阻止命中黑名单的消息（静默阻止，不发送反馈）"""
+        self._record_blocked(event, desc, "blacklist")
+        event.stop_event()
 
-    def _check_friend_message(self, event: AstrMessageEvent) -> bool:
+    def _check_friend_message(self, event: AstrMessageEvent, desc: EventDescriptor, in_whitelist: bool) -> bool:
         """检查好友私聊白名单
         
+        参数:
+            in_whitelist: 是否在好友私聊白名单中（由 _get_membership 计算）
+        
         返回:
             True: 允许通过
             False: 已阻止
         """
         enable_whitelist = self.config.get("enable_friend_message_whitelist", False)
-        logger.debug(f"[好友私聊检查] 白名单开关: {enable_whitelist}, 会话: {event.unified_msg_origin}, 用户ID: {event.get_sender_id()}")
+        self._log.debug("[好友私聊检查] 白名单开关: %s, 会话: %s, 用户ID: %s", enable_whitelist, desc.origin, desc.sender_id)
         
         if not enable_whitelist:
-            logger.debug(f"[好友私聊检查] 白名单未启用，允许通过")
+            self._log.debug("[好友私聊检查] 白名单未启用，允许通过")
             return True  # 未启用白名单，允许通过
         
-        whitelist = self.config.get("friend_message_whitelist", [])
-        logger.debug(f"[好友私聊检查] 白名单内容: {whitelist}")
+        whitelist = self._get_whitelist_index("friend_message_whitelist")
+        self._log.debug("[好友私聊检查] 白名单条目数: %s", len(whitelist))
         
         if not whitelist:
             # 白名单为空，允许通过
-            logger.debug(f"[好友私聊检查] 白名单为空，允许通过")
+            self._log.debug("[好友私聊检查] 白名单为空，允许通过")
             return True
         
-        # 检查是否在白名单中
-        is_in_whitelist = self._match_whitelist(
-            whitelist,
-            user_id=event.get_sender_id(),
-            unified_msg_origin=event.unified_msg_origin
-        )
-        logger.debug(f"[好友私聊检查] 是否在白名单中: {is_in_whitelist}")
+        self._log.debug("[好友私聊检查] 是否在白名单中: %s", in_whitelist)
         
-        if is_in_whitelist:
+        if in_whitelist:
             return True
         
         # 不在白名单中
-        if self.config.get("log_blocked_messages", True):
-            logger.info(f"好友私聊 {event.unified_msg_origin} 不在白名单中，已阻止")
-        
-        # 检查是否应该发送反馈（每天第一次，且仅限新消息）
-        should_send = self._should_send_feedback(event)
-        
-        if should_send:
-            # 每天第一次且是新消息：发送反馈消息
-            logger.debug(f"[好友私聊检查] 发送反馈消息（每天第一次且是新消息）")
-            # 标记已发送反馈
-            self._mark_feedback_sent(event)
-            # 设置消息结果并停止事件
-            event.set_result(
-                MessageEventResult().message("要先经过姐姐同意哦").stop_event()
-            )
-        else:
-            # 后续消息或历史消息：静默阻止
-            is_historical = self._is_historical_message(event)
-            if is_historical:
-                logger.debug(f"[好友私聊检查] 历史消息，静默阻止（不发送反馈）")
-            else:
-                logger.debug(f"[好友私聊检查] 今天已发送过反馈，静默阻止")
-            event.stop_event()
-        
+        self._record_blocked(event, desc, "friend")
+        self._block_with_feedback(event, desc, "friend", "[好友私聊检查]")
         return False
 
-    def _check_group_message(self, event: AstrMessageEvent) -> bool:
-        """检查群聊白名单"""
+    def _check_group_message(self, event: AstrMessageEvent, desc: EventDescriptor, in_whitelist: bool) -> bool:
+        """检查群聊白名单
+        
+        参数:
+            in_whitelist: 是否在群聊白名单中（由 _get_membership 计算）
+        """
         if not self.config.get("enable_group_message_whitelist", False):
             return True  # 未启用白名单，允许通过
         
-        whitelist = self.config.get("group_message_whitelist", [])
+        whitelist = self._get_whitelist_index("group_message_whitelist")
         if not whitelist:
             # 白名单为空，允许通过
             return True
         
-        # 检查是否在白名单中
-        if self._match_whitelist(
-            whitelist,
-            user_id=event.get_sender_id(),
-            group_id=event.get_group_id(),
-            unified_msg_origin=event.unified_msg_origin
-        ):
+        if in_whitelist:
             return True
         
         # 不在白名单中
-        if self.config.get("log_blocked_messages", True):
-            logger.info(f"群聊会话 {event.unified_msg_origin} 不在白名单中，已阻止")
+        self._record_blocked(event, desc, "group")
         
         # 群聊不发送消息，静默阻止
         event.stop_event()
@@ -450,53 +722,105 @@ class AdvancedWhitelistPlugin(Star):
     @filter.event_message_type(filter.EventMessageType.ALL, priority=maxsize)
     async def check_whitelist(self, event: AstrMessageEvent):
         """检查白名单"""
-        message_type = event.get_message_type()
-        unified_msg_origin = event.unified_msg_origin
+        if self._index_build is not None:
+            await self._wait_for_indexes(event)
+        metrics = self._metrics
+        if metrics is None:
+            self.filter_event(event)
+            return
+        start = time.perf_counter_ns()
+        outcome = self.filter_event(event)
+        metrics.observe(event.get_message_type().value, outcome, time.perf_counter_ns() - start)
+
+    def filter_event(self, event: AstrMessageEvent) -> tuple:
+        """判定事件是否放行（check_whitelist 和离线回放工具 tools/replay.py 共用的判定接口）
+
+        被阻止的事件会调用 event.stop_event()，需要时放入反馈消息
+
+        返回:
+            (ALLOWED / BLOCKED, 判定类别)，供运行指标统计
+        """
+        # 所有控制开关均未生效时直接放行，只按节流间隔检测配置变更（开关开启后无需重载即可生效）
+        if not self._policy_plan.active and not self._poll_while_inactive():
+            return ("allowed", "off")
         
-        logger.debug(f"[白名单检查] 消息类型: {message_type}, 会话: {unified_msg_origin}")
+        # 先检测配置变更：名单变更后重建索引会清空刷屏保护状态，新加入白名单的会话不再被丢弃
+        self._refresh_indexes()
         
-        # 首先检查全局白名单（如果在全局白名单中，直接通过）
-        if self._check_global_whitelist(event):
-            logger.debug(f"[白名单检查] {unified_msg_origin} 在全局白名单中，允许通过")
-            return  # 全局白名单，直接通过
+        # 刷屏保护：处于丢弃状态的会话只做一次字典查找即丢弃（请求事件始终进入过滤逻辑）
+        flood_guard = self._flood_guard
+        if flood_guard and not self._is_request_event(event) \
+                and flood_guard.should_drop((event.unified_msg_origin, event.get_sender_id())):
+            event.stop_event()
+            return ("blocked", "flood")
+        
+        type_plan = self._policy_plan.by_type.get(event.get_message_type().value)
+        if type_plan is None:
+            # 该消息类型没有任何需要执行的检查
+            return ("allowed", "off")
+        
+        # 一次性读取事件原始数据，后续检查共用
+        desc = self._classify_event(event)
+        self._log.debug("[白名单检查] %s, 策略: %s", desc, type_plan)
+        
+        # 不需要检查黑名单时，请求事件、未被控制的临时会话和不检查白名单的消息无需计算名单命中结果
+        is_temp = type_plan.detect_temp and desc.is_temp
+        if not type_plan.blacklist_keys:
+            if desc.is_request:
+                self._log.debug("[白名单检查] 检测到请求事件（好友申请/群聊邀请），独立放行: %s", desc.origin)
+                return ("allowed", "request")  # 请求事件独立放行，不受白名单限制
+            if is_temp and not type_plan.block_temp:
+                return ("allowed", "temp")  # 临时会话控制未启用，允许通过
+            if not is_temp and type_plan.list_key is None:
+                return ("allowed", "off")
+        
+        # 一次性计算全局白名单、黑名单和白名单的命中结果（整体缓存）
+        in_global, in_blacklist, in_whitelist = self._get_membership(desc, type_plan)
+        if in_global:
+            self._log.debug("[白名单检查] %s 在全局白名单中，允许通过", desc.origin)
+            return ("allowed", "global")  # 全局白名单，直接通过
+        
+        if in_blacklist:
+            self._log.debug("[白名单检查] %s 命中黑名单，静默阻止", desc.origin)
+            self._block_blacklisted(event, desc)
+            return ("blocked", "blacklist")
         
         # 检查是否为请求事件（好友申请、群聊邀请等），请求事件独立放行，不受白名单限制
-        if self._is_request_event(event):
-            logger.debug(f"[白名单检查] 检测到请求事件（好友申请/群聊邀请），独立放行: {unified_msg_origin}")
-            return  # 请求事件独立放行，不受白名单限制
+        if desc.is_request:
+            self._log.debug("[白名单检查] 检测到请求事件（好友申请/群聊邀请），独立放行: %s", desc.origin)
+            return ("allowed", "request")  # 请求事件独立放行，不受白名单限制
         
         # 检查是否为临时会话（需要特殊处理，因为QQ的临时会话可能是FRIEND_MESSAGE类型）
-        is_temp_session = self._is_temporary_session(event)
-        
-        if is_temp_session:
-            # 临时会话
-            logger.debug(f"[白名单检查] 检测到临时会话: {unified_msg_origin}")
-            if not self._check_temp_session(event):
-                logger.debug(f"[白名单检查] 临时会话被阻止: {unified_msg_origin}")
+        if is_temp:
+            self._log.debug("[白名单检查] 检测到临时会话: %s", desc.origin)
+            if not type_plan.block_temp:
+                return ("allowed", "temp")  # 临时会话控制未启用，允许通过
+            if not self._check_temp_session(event, desc):
+                self._log.debug("[白名单检查] 临时会话被阻止: %s", desc.origin)
                 # _check_temp_session 内部已经处理了 stop_event，这里直接返回
-                return
-        elif message_type == MessageType.FRIEND_MESSAGE:
+                return ("blocked", "temp")
+            return ("allowed", "temp")
+        
+        if type_plan.list_key is None:
+            return ("allowed", "off")
+        
+        if desc.kind == KIND_FRIEND:
             # 好友私聊（非临时会话）
-            logger.debug(f"[白名单检查] 检测到好友私聊: {unified_msg_origin}")
-            if not self._check_friend_message(event):
-                logger.debug(f"[白名单检查] 好友私聊被阻止: {unified_msg_origin}")
+            self._log.debug("[白名单检查] 检测到好友私聊: %s", desc.origin)
+            if not self._check_friend_message(event, desc, in_whitelist):
+                self._log.debug("[白名单检查] 好友私聊被阻止: %s", desc.origin)
                 # _check_friend_message 内部已经处理了 stop_event，这里直接返回
-                return
-        elif message_type == MessageType.GROUP_MESSAGE:
+                return ("blocked", "friend")
+            return ("allowed", "friend")
+        elif desc.kind == KIND_GROUP:
             # 群聊
-            logger.debug(f"[白名单检查] 检测到群聊: {unified_msg_origin}")
-            if not self._check_group_message(event):
-                logger.debug(f"[白名单检查] 群聊被阻止: {unified_msg_origin}")
+            self._log.debug("[白名单检查] 检测到群聊: %s", desc.origin)
+            if not self._check_group_message(event, desc, in_whitelist):
+                self._log.debug("[白名单检查] 群聊被阻止: %s", desc.origin)
                 # _check_group_message 内部已经处理了 stop_event，这里直接返回
-                return
-        elif message_type == MessageType.OTHER_MESSAGE:
-            # 其他类型的临时会话
-            logger.debug(f"[白名单检查] 检测到其他类型临时会话: {unified_msg_origin}")
-            if not self._check_temp_session(event):
-                logger.debug(f"[白名单检查] 临时会话被阻止: {unified_msg_origin}")
-                return
-        else:
-            logger.debug(f"[白名单检查] 未知消息类型: {message_type}, 会话: {unified_msg_origin}")
+                return ("blocked", "group")
+            return ("allowed", "group")
+        return ("allowed", "off")
 
     @filter.command_group("awb")
     def awb(self):
@@ -505,14 +829,15 @@ class AdvancedWhitelistPlugin(Star):
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @awb.command("add_wl")
-    async def add_whitelist(self, event: AstrMessageEvent, list_type: str = "", qq_or_group_id: str = ""):
-        """添加白名单。awb add_wl <类型> <QQ号或群号>"""
+    async def add_whitelist(self, event: AstrMessageEvent, list_type: str = "", qq_or_group_id: str = "", expiry: str = ""):
+        """添加白名单。awb add_wl <类型> <QQ号或群号> [有效期]"""
         if not list_type or not qq_or_group_id:
             event.set_result(MessageEventResult().message(
-                "使用方法: /awb add_wl <类型> <QQ号或群号>\n"
+                "使用方法: /awb add_wl <类型> <QQ号或群号> [有效期]\n"
                 "类型: friend(好友私聊), group(群聊), global(全局)\n"
+                "有效期: 时长（如 30m、2h、7d）或到期时间（如 2026-12-31T18:00），省略时永久有效\n"
                 "示例: /awb add_wl friend 12345678\n"
-                "示例: /awb add_wl group 123456789"
+                "示例: /awb add_wl group 123456789 7d"
             ))
             return
         
@@ -532,19 +857,29 @@ class AdvancedWhitelistPlugin(Star):
         config_key = config_key_map[list_type]
         whitelist = self.config.get(config_key, [])
         
+        ok, expires_at = self._parse_expiry_arg(event, expiry)
+        if not ok:
+            return
+        
         # 去除空格
         qq_or_group_id = qq_or_group_id.strip()
         
         if qq_or_group_id not in whitelist:
             whitelist.append(qq_or_group_id)
             self.config[config_key] = whitelist
-            self.config.save_config()
+            # 不带有效期时也要调用，取消同名条目在命令之外被删除后遗留的到期时间（新条目不附加该说明）
+            note = self._update_expiry(config_key, qq_or_group_id, expires_at)
+            if expires_at is None:
+                note = ""
+            self._on_whitelist_changed(config_key)
             event.set_result(MessageEventResult().message(
-                f"已添加到{list_type}白名单: {qq_or_group_id}\n"
+                f"已添加到{list_type}白名单: {qq_or_group_id}{note}\n"
                 f"（可直接输入QQ号或群号，系统会自动匹配不同平台的格式）"
             ))
         else:
-            event.set_result(MessageEventResult().message(f"{qq_or_group_id} 已在{list_type}白名单中"))
+            # 已有条目：带有效期时设置/修改到期时间，不带时将限时条目改为永久
+            note = self._update_expiry(config_key, qq_or_group_id, expires_at)
+            event.set_result(MessageEventResult().message(f"{qq_or_group_id} 已在{list_type}白名单中{note}"))
 
     @filter.permission_type(filter.PermissionType.ADMIN)
     @awb.command("del_wl")
@@ -578,14 +913,235 @@ class AdvancedWhitelistPlugin(Star):
         try:
             whitelist.remove(qq_or_group_id)
             self.config[config_key] = whitelist
-            self.config.save_config()
+            if self._expiry.cancel(config_key, qq_or_group_id):
+                self._expiry_saver.mark_dirty()
+            self._on_whitelist_changed(config_key)
             event.set_result(MessageEventResult().message(f"已从{list_type}白名单删除: {qq_or_group_id}"))
         except ValueError:
+            if self._whitelist_store is not None and self._whitelist_store.remove(config_key, [qq_or_group_id]):
+                self._on_whitelist_changed(config_key, save=False)
+                event.set_result(MessageEventResult().message(f"已从{list_type}白名单（外部存储）删除: {qq_or_group_id}"))
+                return
             event.set_result(MessageEventResult().message(f"{qq_or_group_id} 不在{list_type}白名单中"))
 
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @awb.command("add_bl")
+    async def add_blacklist(self, event: AstrMessageEvent, list_type: str = "", qq_or_group_id: str = "", expiry: str = ""):
+        """添加黑名单。awb add_bl <类型> <QQ号、群号 或 群号/QQ号> [有效期]"""
+        if not list_type or not qq_or_group_id:
+            event.set_result(MessageEventResult().message(
+                "使用方法: /awb add_bl <类型> <QQ号、群号 或 群号/QQ号> [有效期]\n"
+                "类型: friend(好友私聊), group(群聊), global(全局)\n"
+                "有效期: 时长（如 30m、2h、7d）或到期时间（如 2026-12-31T18:00），省略时永久有效\n"
+                "示例: /awb add_bl friend 12345678 1d\n"
+                "示例: /awb add_bl group 123456789/12345678（只屏蔽该群中的该成员）"
+            ))
+            return
+        
+        list_type = list_type.lower()
+        if list_type not in BLACKLIST_KEYS:
+            event.set_result(MessageEventResult().message(
+                "类型错误！支持的类型: friend, group, global"
+            ))
+            return
+        
+        config_key = BLACKLIST_KEYS[list_type]
+        blacklist = self.config.get(config_key, [])
+        
+        ok, expires_at = self._parse_expiry_arg(event, expiry)
+        if not ok:
+            return
+        
+        # 去除空格
+        qq_or_group_id = qq_or_group_id.strip()
+        
+        if qq_or_group_id not in blacklist:
+            blacklist.append(qq_or_group_id)
+            self.config[config_key] = blacklist
+            # 不带有效期时也要调用，取消同名条目在命令之外被删除后遗留的到期时间（新条目不附加该说明）
+            note = self._update_expiry(config_key, qq_or_group_id, expires_at)
+            if expires_at is None:
+                note = ""
+            self._on_whitelist_changed(config_key)
+            msg = f"已添加到{list_type}黑名单: {qq_or_group_id}{note}"
+            if not self.config.get("enable_blacklist", False):
+                msg += "\n（黑名单开关未开启，请在插件配置中开启 enable_blacklist 后生效）"
+            event.set_result(MessageEventResult().message(msg))
+        else:
+            note = self._update_expiry(config_key, qq_or_group_id, expires_at)
+            event.set_result(MessageEventResult().message(f"{qq_or_group_id} 已在{list_type}黑名单中{note}"))
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @awb.command("del_bl")
+    async def del_blacklist(self, event: AstrMessageEvent, list_type: str = "", qq_or_group_id: str = ""):
+        """删除黑名单。awb del_bl <类型> <QQ号、群号 或 群号/QQ号>"""
+        if not list_type or not qq_or_group_id:
+            event.set_result(MessageEventResult().message(
+                "使用方法: /awb del_bl <类型> <QQ号、群号 或 群号/QQ号>\n"
+                "类型: friend(好友私聊), group(群聊), global(全局)"
+            ))
+            return
+        
+        list_type = list_type.lower()
+        if list_type not in BLACKLIST_KEYS:
+            event.set_result(MessageEventResult().message(
+                "类型错误！支持的类型: friend, group, global"
+            ))
+            return
+        
+        config_key = BLACKLIST_KEYS[list_type]
+        blacklist = self.config.get(config_key, [])
+        
+        qq_or_group_id = qq_or_group_id.strip()
+        
+        try:
+            blacklist.remove(qq_or_group_id)
+            self.config[config_key] = blacklist
+            if self._expiry.cancel(config_key, qq_or_group_id):
+                self._expiry_saver.mark_dirty()
+            self._on_whitelist_changed(config_key)
+            event.set_result(MessageEventResult().message(f"已从{list_type}黑名单删除: {qq_or_group_id}"))
+        except ValueError:
+            event.set_result(MessageEventResult().message(f"{qq_or_group_id} 不在{list_type}黑名单中"))
+
+    def import_whitelist(self, list_type: str, entries) -> int:
+        """批量导入白名单（Python API）
+        
+        启用外部存储（use_external_store）时写入外部存储，否则合并到配置中的白名单
+
+        参数:
+            list_type: friend / group / global
+            entries: 换行或逗号分隔的文本，或条目列表
+        
+        返回:
+            新增条目数。整批合并后只写入一次配置
+        """
+        config_key = WHITELIST_KEYS[list_type]
+        if isinstance(entries, str):
+            entries = parse_entries(entries)
+        else:
+            entries = [str(item).strip() for item in entries if str(item).strip()]
+        if self._whitelist_store is not None:
+            # 启用外部存储时，批量导入写入外部存储，不增大配置文件；规则条目只在配置中生效
+            entries, rules = self._split_rules(entries)
+            added = self._whitelist_store.add(config_key, entries)
+            if added:
+                self._on_whitelist_changed(config_key, save=False)
+            return added + self._merge_config_entries(config_key, rules)
+        return self._merge_config_entries(config_key, entries)
+
+    @staticmethod
+    def _split_rules(entries: list) -> tuple:
+        """拆分为 (普通条目, range:/prefix:/glob:/re: 规则条目)"""
+        rules = [entry for entry in entries if is_rule(entry)]
+        if not rules:
+            return entries, rules
+        return [entry for entry in entries if not is_rule(entry)], rules
+
+    def _merge_config_entries(self, config_key: str, entries: list) -> int:
+        """将条目合并到配置中的白名单（去重、保持原有顺序），返回新增条目数"""
+        if not entries:
+            return 0
+        merged, added = merge_entries(self.config.get(config_key, []), entries)
+        if added:
+            self.config[config_key] = merged
+            self._on_whitelist_changed(config_key)
+        return added
+
+    def export_whitelist(self, list_type: str) -> list:
+        """导出白名单（Python API），返回配置中的条目及外部存储中的条目"""
+        config_key = WHITELIST_KEYS[list_type]
+        entries = list(self.config.get(config_key, []))
+        if self._whitelist_store is not None:
+            entries, _ = merge_entries(entries, self._whitelist_store.entries(config_key))
+        return entries
+
+    def _resolve_data_file(self, filename: str) -> Path:
+        """将文件名解析为插件数据目录下的路径（只取文件名部分，不允许访问其他目录）"""
+        return self._get_data_dir() / Path(filename).name
+
+    @staticmethod
+    def _get_command_payload(event: AstrMessageEvent, command: str) -> str:
+        """获取命令中类型参数之后的全部文本（可包含换行）"""
+        match = re.search(rf"{command}\s+\S+\s*(.*)$", event.message_str or "", re.DOTALL)
+        return match.group(1).strip() if match else ""
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @awb.command("import")
+    async def import_list(self, event: AstrMessageEvent, list_type: str = "", source: str = ""):
+        """批量导入白名单。awb import <类型> <文件名 或 换行/逗号分隔的QQ号或群号>"""
+        list_type = list_type.lower()
+        payload = self._get_command_payload(event, "import") or source.strip()
+        if list_type not in WHITELIST_KEYS or not payload:
+            event.set_result(MessageEventResult().message(
+                "使用方法: /awb import <类型> <文件名 或 QQ号/群号列表>\n"
+                "类型: friend(好友私聊), group(群聊), global(全局)\n"
+                "示例: /awb import group 123456789,987654321\n"
+                "示例: /awb import group groups.txt（文件需放在插件数据目录中，每行一个或逗号分隔；.csv 文件只读取第一列）"
+            ))
+            return
+        
+        # 单个以 .txt/.csv 结尾的参数视为插件数据目录中的文件
+        is_csv = False
+        if not ENTRY_SEPARATORS.search(payload) and payload.lower().endswith((".txt", ".csv")):
+            path = self._resolve_data_file(payload)
+            is_csv = path.suffix.lower() == ".csv"
+            try:
+                payload = await asyncio.to_thread(path.read_text, encoding="utf-8-sig")
+            except OSError as e:
+                event.set_result(MessageEventResult().message(f"读取文件失败: {path}（{e}）"))
+                return
+        
+        entries = parse_entries(payload, csv_first_column=is_csv)
+        if self._whitelist_store is not None:
+            # 大批量写入外部存储在线程池中执行，写入完成后再重建索引；规则条目只在配置中生效
+            config_key = WHITELIST_KEYS[list_type]
+            ids, rules = self._split_rules(entries)
+            added = await asyncio.to_thread(self._whitelist_store.add, config_key, ids)
+            if added:
+                self._on_whitelist_changed(config_key, save=False)
+            added += self._merge_config_entries(config_key, rules)
+        else:
+            added = self.import_whitelist(list_type, entries)
+        event.set_result(MessageEventResult().message(
+            f"已导入到{list_type}白名单: 新增 {added} 条，跳过重复 {len(entries) - added} 条"
+        ))
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @awb.command("export")
+    async def export_list(self, event: AstrMessageEvent, list_type: str = "", filename: str = ""):
+        """导出白名单到插件数据目录。awb export <类型> [文件名]"""
+        list_type = list_type.lower()
+        if list_type not in WHITELIST_KEYS:
+            event.set_result(MessageEventResult().message(
+                "使用方法: /awb export <类型> [文件名]\n"
+                "类型: friend(好友私聊), group(群聊), global(全局)"
+            ))
+            return
+        
+        entries = await asyncio.to_thread(self.export_whitelist, list_type)
+        path = self._resolve_data_file(filename or f"whitelist_{list_type}.txt")
+        try:
+            await asyncio.to_thread(path.write_text, format_entries(entries), encoding="utf-8")
+        except OSError as e:
+            event.set_result(MessageEventResult().message(f"写入文件失败: {path}（{e}）"))
+            return
+        event.set_result(MessageEventResult().message(f"已导出{list_type}白名单 {len(entries)} 条到: {path}"))
+
+    def _store_note(self, config_key: str) -> str:
+        """外部存储中的条目数说明（未启用外部存储时为空）"""
+        if self._whitelist_store is None:
+            return ""
+        return f"（另有外部存储 {self._whitelist_store.count(config_key)} 条）"
+
+    def _expiry_note(self, config_key: str, entry: str) -> str:
+        """限时条目的到期时间说明（永久条目为空）"""
+        expires_at = self._expiry.get(config_key, entry)
+        return f"（到期: {format_expiry(expires_at)}）" if expires_at is not None else ""
+
     @awb.command("list")
-    async def list_all(self, event: AstrMessageEvent, list_type: str = ""):
-        """查看白名单。awb list [类型]"""
+    async def list_all(self, event: AstrMessageEvent, list_type: str = "", page: str = "", search: str = ""):
+        """查看白名单。awb list [类型] [页码] [--search 前缀]"""
         if not list_type:
             # 显示所有列表
             msg = "=== 高级白名单列表 ===\n\n"
@@ -598,18 +1154,28 @@ class AdvancedWhitelistPlugin(Star):
             msg += "【好友私聊】\n"
             msg += f"白名单开关: {'开启' if self.config.get('enable_friend_message_whitelist', False) else '关闭'}\n"
             friend_wl = self.config.get("friend_message_whitelist", [])
-            msg += f"白名单({len(friend_wl)}): {', '.join(friend_wl[:10])}{' ...' if len(friend_wl) > 10 else ''}\n\n"
+            msg += f"白名单({len(friend_wl)}){self._store_note('friend_message_whitelist')}: {', '.join(friend_wl[:10])}{' ...' if len(friend_wl) > 10 else ''}\n"
+            friend_bl = self.config.get("friend_message_blacklist", [])
+            msg += f"黑名单({len(friend_bl)}): {', '.join(friend_bl[:10])}{' ...' if len(friend_bl) > 10 else ''}\n\n"
             
             # 群聊
             msg += "【群聊】\n"
             msg += f"白名单开关: {'开启' if self.config.get('enable_group_message_whitelist', False) else '关闭'}\n"
             group_wl = self.config.get("group_message_whitelist", [])
-            msg += f"白名单({len(group_wl)}): {', '.join(group_wl[:10])}{' ...' if len(group_wl) > 10 else ''}\n\n"
+            msg += f"白名单({len(group_wl)}){self._store_note('group_message_whitelist')}: {', '.join(group_wl[:10])}{' ...' if len(group_wl) > 10 else ''}\n"
+            group_bl = self.config.get("group_message_blacklist", [])
+            msg += f"黑名单({len(group_bl)}): {', '.join(group_bl[:10])}{' ...' if len(group_bl) > 10 else ''}\n\n"
             
             # 全局
             msg += "【全局】\n"
             global_wl = self.config.get("global_whitelist", [])
-            msg += f"白名单({len(global_wl)}): {', '.join(global_wl[:10])}{' ...' if len(global_wl) > 10 else ''}\n"
+            msg += f"白名单({len(global_wl)}){self._store_note('global_whitelist')}: {', '.join(global_wl[:10])}{' ...' if len(global_wl) > 10 else ''}\n"
+            global_bl = self.config.get("global_blacklist", [])
+            msg += f"黑名单({len(global_bl)}): {', '.join(global_bl[:10])}{' ...' if len(global_bl) > 10 else ''}\n\n"
+            
+            # 黑名单
+            msg += "【黑名单】\n"
+            msg += f"黑名单开关: {'开启' if self.config.get('enable_blacklist', False) else '关闭'}\n"
             
             event.set_result(MessageEventResult().message(msg).use_t2i(False))
             return
@@ -628,18 +1194,172 @@ class AdvancedWhitelistPlugin(Star):
             return
         
         type_name, wl_key = type_map[list_type]
-        whitelist = self.config.get(wl_key, [])
-        
-        msg = f"=== {type_name}白名单 ===\n\n"
-        msg += f"白名单({len(whitelist)}):\n"
-        if whitelist:
-            for item in whitelist:
-                msg += f"  - {item}\n"
+        page, search = self._parse_list_args(self._get_command_payload(event, "list") or f"{page} {search}")
+        page_size = self.config.get("list_page_size", 50)
+        
+        lines = [f"=== {type_name}白名单 ===", ""]
+        lines += self._format_list_page("白名单", wl_key, page, search, page_size)
+        if self._whitelist_store is not None:
+            lines += self._format_store_page(wl_key, page, search, page_size)
+        lines.append("")
+        lines += self._format_list_page("黑名单", BLACKLIST_KEYS[list_type], page, search, page_size)
+        lines.append("")
+        lines.append(f"翻页: /awb list {list_type} <页码>" + (f" --search {search}" if search else " [--search 前缀]"))
+        
+        event.set_result(MessageEventResult().message("\n".join(lines)).use_t2i(False))
+
+    @staticmethod
+    def _parse_list_args(text: str) -> tuple:
+        """解析 list 命令类型之后的参数，返回 (页码, 搜索前缀)
+
+        支持 "<页码>"、"--search <前缀>"（或 -s）以及两者任意顺序的组合
+        """
+        page, search = 1, ""
+        tokens = text.split()
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in ("--search", "-s") and i + 1 < len(tokens):
+                search = tokens[i + 1]
+                i += 2
+                continue
+            if token.isdigit():
+                page = int(token)
+            i += 1
+        return page, search
+
+    def _get_list_view(self, config_key: str, entries: list) -> EntryView:
+        """名单的排序视图，名单变更后第一次搜索时重建
+
+        先检测配置变更，使 ConfigWatcher 的代数反映最新的名单；后台构建索引期间不检测变更，此时不复用视图
+        """
+        self._refresh_indexes()
+        generation = self._config_watcher.generation
+        view = self._list_views.get(config_key)
+        if view is None or self._index_build is not None or not view.is_current(generation):
+            view = self._list_views[config_key] = EntryView(entries, generation)
+        return view
+
+    def _format_list_page(self, title: str, config_key: str, page: int, search: str, page_size: int) -> list:
+        """生成名单某一页的文本行：未搜索时按添加顺序分页，搜索时在排序视图上按前缀分页"""
+        entries = self.config.get(config_key, [])
+        if search:
+            view = self._get_list_view(config_key, entries)
+            lo, hi = view.prefix_range(search)
+            source = view.entries
         else:
-            msg += "  (空)\n"
+            lo, hi = 0, len(entries)
+            source = entries
+        page, pages, start, end = paginate(hi - lo, page, page_size)
+        header = f"{title}({len(entries)})"
+        if search:
+            header += f"，以 {search} 开头的 {hi - lo} 条"
+        lines = [f"{header}，第 {page}/{pages} 页:"]
+        lines += [f"  - {item}{self._expiry_note(config_key, item)}" for item in source[lo + start:lo + end]]
+        if start == end:
+            lines.append("  (无匹配)" if search else "  (空)")
+        return lines
+
+    def _format_store_page(self, config_key: str, page: int, search: str, page_size: int) -> list:
+        """生成外部存储中白名单条目某一页的文本行（主键上的范围查询，只读取该页）"""
+        page_size = max(int(page_size or 0), 1)
+        offset = (max(page, 1) - 1) * page_size
+        try:
+            items, total = self._whitelist_store.page(config_key, search, offset, page_size)
+            page, pages, start, _ = paginate(total, page, page_size)
+            if start != offset:
+                # 页码超出范围时改为读取最后一页
+                items, total = self._whitelist_store.page(config_key, search, start, page_size)
+        except Exception as e:
+            return [f"外部存储: 读取失败（{e}）"]
+        lines = [f"外部存储({total}{' 条匹配' if search else ''})，第 {page}/{pages} 页:"]
+        lines += [f"  - {item}" for item in items]
+        if not items:
+            lines.append("  (无匹配)" if search else "  (空)")
+        return lines
+
+    def _collect_cache_stats(self) -> dict:
+        """各缓存的命中率和占用，供运行指标快照使用"""
+        origin_cache = parse_origin.cache_info()
+        origin_total = origin_cache.hits + origin_cache.misses
+        return {
+            "decision_cache": self._decision_cache.stats(),
+            "origin_parse_cache": {
+                "size": origin_cache.currsize,
+                "maxsize": origin_cache.maxsize,
+                "hits": origin_cache.hits,
+                "misses": origin_cache.misses,
+                "hit_rate": origin_cache.hits / origin_total if origin_total else 0.0,
+            },
+            "feedback_limiter": {
+                "size": len(self._feedback_limiter),
+                "maxsize": self._feedback_limiter.maxsize,
+                "suppressed": self._feedback_limiter.suppressed,
+            },
+            "flood_guard": self._flood_guard.stats(),
+            "feedback_outbox": self._feedback_outbox.stats(),
+            "index_build": dict(self._index_build_stats),
+        }
+
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    @awb.command("stats")
+    async def show_stats(self, event: AstrMessageEvent, dump_format: str = ""):
+        """查看运行指标。awb stats [json|prometheus]"""
+        if self._metrics is None:
+            event.set_result(MessageEventResult().message("运行指标未启用（enable_metrics）"))
+            return
+        
+        dump_format = dump_format.lower()
+        if dump_format and dump_format not in METRICS_DUMP_FILES:
+            event.set_result(MessageEventResult().message(
+                "使用方法: /awb stats [json|prometheus]\n"
+                "不带参数时显示摘要，带参数时将指标写入插件数据目录"
+            ))
+            return
         
+        msg = "=== 高级白名单运行指标 ===\n\n" + format_summary(self._metrics.snapshot())
+        if dump_format:
+            try:
+                path = await self._metrics.dump(self._get_data_dir() / METRICS_DUMP_FILES[dump_format], dump_format)
+            except OSError as e:
+                msg += f"\n\n写入文件失败: {e}"
+            else:
+                msg += f"\n\n已写入: {path}"
         event.set_result(MessageEventResult().message(msg).use_t2i(False))
 
     async def terminate(self):
         """插件停用时调用"""
+        if self._index_build is not None:
+            self._index_build.cancel()
+            self._index_build = None
+        try:
+            await self._expiry.close()
+            await self._expiry_saver.close()
+        except Exception as e:
+            logger.warning(f"保存限时条目到期时间失败: {e}")
+        try:
+            await self._config_saver.close()
+        except Exception as e:
+            logger.warning(f"保存插件配置失败: {e}")
+        try:
+            await self._audit_log.close()
+        except Exception as e:
+            logger.warning(f"输出拦截日志汇总失败: {e}")
+        discarded = await self._feedback_outbox.close()
+        if discarded:
+            logger.info(f"插件停用，{discarded} 条排队中的反馈消息未发送")
+        if self._feedback_journal is not None:
+            try:
+                await self._feedback_journal.close()
+            except Exception as e:
+                logger.warning(f"保存反馈频率控制状态失败: {e}")
+        if self._whitelist_store is not None:
+            self._whitelist_store.close()
+        if self._metrics is not None:
+            try:
+                await self._metrics.close()
+            except Exception as e:
+                logger.warning(f"写入运行指标失败: {e}")
+        if self._flood_guard.shed:
+            logger.info(f"刷屏保护共直接丢弃 {self._flood_guard.shed} 条消息")
         logger.info("高级白名单插件已卸载")
@@ -0,0 +1,115 @@
+"""
+名单匹配语义检查
+通过 benchmarks/_stubs.py 中的最小 AstrBot 运行时加载插件，用 filter_event 逐条验证名单条目的匹配规则，
+修改 awb_core/index.py 或事件分类后运行，防止名单匹配在不知不觉中放行或阻止用户
+
+覆盖场景：
+- 纯ID条目：只在已启用的平台上匹配；未配置任何平台时不限平台
+- platform:Type:id 条目：只在对应平台上匹配，FriendMessage 条目匹配用户ID（群聊中同样匹配该用户），
+  GroupMessage 条目匹配群ID
+- 会话隔离（unique_session）：会话ID为 "用户_群" 时按群ID匹配群聊条目
+- 群号/QQ号 条目：只匹配该群中的该发送者
+
+运行: python tools/check_matching.py（全部通过时退出码为 0，否则列出失败的检查并返回 1）
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from _stubs import StarTools, StubEvent, make_plugin  # noqa: E402
+
+BASE_CONFIG = {
+    "enable_metrics": False,
+    "log_blocked_messages": False,
+    "persist_feedback_state": False,
+    "use_external_store": False,
+    "config_save_debounce": 0,
+    "flood_block_threshold": 0,
+}
+
+
+def friend(user: str, platform: str = "aiocqhttp") -> StubEvent:
+    raw = {"post_type": "message", "message_type": "private", "sub_type": "friend", "time": int(time.time())}
+    return StubEvent(f"{platform}:FriendMessage:{user}", user, raw_message=raw, platform_name=platform)
+
+
+def group(group_id: str, user: str, session: str = None, platform: str = "aiocqhttp") -> StubEvent:
+    raw = {"post_type": "message", "message_type": "group", "time": int(time.time())}
+    return StubEvent(f"{platform}:GroupMessage:{session or group_id}", user, group_id,
+                     message_type="GroupMessage", raw_message=raw, platform_name=platform)
+
+
+def friend_whitelist(*entries) -> dict:
+    return {"enable_friend_message_whitelist": True, "friend_message_whitelist": list(entries)}
+
+
+def group_whitelist(*entries) -> dict:
+    return {"enable_group_message_whitelist": True, "group_message_whitelist": list(entries)}
+
+
+# (说明, 名单配置, 已启用的平台, 事件, 是否应放行)
+CASES = (
+    ("纯ID匹配已启用平台上的好友", friend_whitelist("123"), ("aiocqhttp",), friend("123"), True),
+    ("纯ID不匹配其他好友", friend_whitelist("123"), ("aiocqhttp",), friend("124"), False),
+    ("纯ID不匹配未启用平台上的好友", friend_whitelist("123"), ("aiocqhttp",), friend("123", "telegram"), False),
+    ("纯ID匹配任一已启用平台", friend_whitelist("123"), ("aiocqhttp", "telegram"), friend("123", "telegram"), True),
+    ("未配置平台时纯ID不限平台", friend_whitelist("123"), (), friend("123", "telegram"), True),
+    ("纯ID匹配已启用平台上的群", group_whitelist("901"), ("aiocqhttp",), group("901", "123"), True),
+    ("纯ID不匹配未启用平台上的群", group_whitelist("901"), ("aiocqhttp",), group("901", "123", platform="telegram"), False),
+    ("完整会话标识精确匹配", friend_whitelist("aiocqhttp:FriendMessage:123"), ("aiocqhttp",), friend("123"), True),
+    ("telegram 好友条目不匹配QQ上的同号用户",
+     friend_whitelist("telegram:FriendMessage:123"), ("aiocqhttp", "telegram"), friend("123"), False),
+    ("telegram 好友条目匹配 telegram 上的该用户",
+     friend_whitelist("telegram:FriendMessage:123"), ("aiocqhttp", "telegram"), friend("123", "telegram"), True),
+    ("平台条目不受平台ID配置限制",
+     friend_whitelist("telegram:FriendMessage:123"), ("aiocqhttp",), friend("123", "telegram"), True),
+    ("好友条目在群聊名单中匹配群内的该用户",
+     group_whitelist("aiocqhttp:FriendMessage:123"), ("aiocqhttp",), group("902", "123"), True),
+    ("好友条目在群聊名单中不匹配群内其他用户",
+     group_whitelist("aiocqhttp:FriendMessage:123"), ("aiocqhttp",), group("902", "124"), False),
+    ("群条目不匹配同号好友", friend_whitelist("aiocqhttp:GroupMessage:123"), ("aiocqhttp",), friend("123"), False),
+    ("会话隔离：群条目匹配 用户_群 会话",
+     group_whitelist("aiocqhttp:GroupMessage:901"), ("aiocqhttp",), group("901", "123", "123_901"), True),
+    ("会话隔离：纯ID群条目匹配 用户_群 会话",
+     group_whitelist("901"), ("aiocqhttp",), group("901", "123", "123_901"), True),
+    ("会话隔离：群条目不匹配其他群",
+     group_whitelist("aiocqhttp:GroupMessage:901"), ("aiocqhttp",), group("902", "123", "123_902"), False),
+    ("群号/QQ号 匹配该群中的该发送者", group_whitelist("901/123"), ("aiocqhttp",), group("901", "123"), True),
+    ("群号/QQ号 不匹配该群中的其他发送者", group_whitelist("901/123"), ("aiocqhttp",), group("901", "124"), False),
+    ("群号/QQ号 不匹配该发送者在其他群", group_whitelist("901/123"), ("aiocqhttp",), group("902", "123"), False),
+    ("群号/QQ号 不匹配未启用平台", group_whitelist("901/123"), ("aiocqhttp",),
+     group("901", "123", platform="telegram"), False),
+)
+
+
+def run() -> list:
+    """逐条检查，返回失败的检查说明"""
+    failures = []
+    for name, lists, platforms, event, expected in CASES:
+        plugin = make_plugin({**BASE_CONFIG, **lists}, platforms=platforms)
+        outcome = plugin.filter_event(event)
+        allowed = outcome[0] == "allowed"
+        if allowed != expected or allowed == event.is_stopped():
+            failures.append(f"{name}: 期望{'放行' if expected else '阻止'}，实际 {outcome}")
+    return failures
+
+
+def main():
+    logging.getLogger("astrbot").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory(prefix="awb_check_") as data_dir:
+        # 插件数据目录指向临时目录，不读写真实的数据文件
+        StarTools.data_dir = data_dir
+        failures = run()
+    for failure in failures:
+        print(f"失败 {failure}")
+    print(f"{len(CASES) - len(failures)}/{len(CASES)} 项检查通过")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
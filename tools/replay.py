@@ -0,0 +1,274 @@
+"""
+离线回放
+将录制的事件日志（JSONL）逐条送入插件的判定接口 filter_event（与 check_whitelist 相同），统计按类别的放行/阻止数和回放吞吐量，
+用于在生产环境中开启开关或大批量修改名单之前，评估会有多少流量被阻止
+
+事件日志每行一个 JSON 对象：
+    origin          会话标识 unified_msg_origin（必填，字段名也可以是 unified_msg_origin）
+    sender          发送者ID（也可写作 sender_id）
+    group           群ID（也可写作 group_id）
+    message_type    FriendMessage / GroupMessage / OtherMessage，省略时取 origin 的第二段
+    platform        适配器类型（如 aiocqhttp），省略时取 origin 的第一段
+    raw             原始事件数据（如 OneBot 的 post_type / message_type / sub_type）
+    post_type / sub_type  未提供 raw 时用于构造原始事件数据
+    time            Unix 时间戳，用于刷屏保护的时间窗口
+
+读取、解析、构造事件和判定是逐条流经的生成器流水线，内存占用与日志大小无关，
+可直接回放数 GB 的日志（支持 .gz 文件，- 表示标准输入）。
+
+插件通过 benchmarks/_stubs.py 中的最小 AstrBot 运行时加载，无需安装 AstrBot。
+
+运行:
+    python tools/replay.py events.jsonl --config data/config/astrbot_plugin_whitelistpro_config.json
+    python tools/replay.py events.jsonl.gz --config cfg.json --set enable_group_message_whitelist=true --compare
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from _stubs import StarTools, StubEvent, make_plugin  # noqa: E402
+
+# 回放时强制的配置：关闭所有会写文件或外部存储的功能，判定结果由回放自行统计
+REPLAY_OVERRIDES = {
+    "enable_metrics": False,
+    "metrics_dump_format": "",
+    "log_blocked_messages": False,
+    "blocked_log_jsonl": False,
+    "persist_feedback_state": False,
+    "use_external_store": False,
+    "config_save_debounce": 0,
+}
+
+# OneBot 原始事件中的 message_type
+_RAW_MESSAGE_TYPES = {"FriendMessage": "private", "GroupMessage": "group"}
+
+PROGRESS_EVERY = 1_000_000
+
+
+def parse_override(text: str) -> tuple:
+    """解析 key=value，value 按 JSON 解析，失败时作为字符串"""
+    key, sep, value = text.partition("=")
+    if not sep or not key.strip():
+        raise argparse.ArgumentTypeError(f"格式应为 key=value: {text}")
+    try:
+        return key.strip(), json.loads(value)
+    except ValueError:
+        return key.strip(), value
+
+
+def load_config(path, overrides) -> dict:
+    config = {}
+    if path:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            config = json.load(f)
+    config.update(overrides)
+    return config
+
+
+def read_lines(paths):
+    """逐行读取日志文件（二进制模式，不整体载入内存）"""
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin.buffer
+        elif path.endswith(".gz"):
+            with gzip.open(path, "rb") as f:
+                yield from f
+        else:
+            with open(path, "rb") as f:
+                yield from f
+
+
+def parse_records(lines, errors: list):
+    """解析 JSONL，跳过空行；无法解析的行计入 errors[0]"""
+    loads = json.loads
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            errors[0] += 1
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            errors[0] += 1
+
+
+def build_events(records, errors: list):
+    """将记录转换为 (事件, 时间戳)；缺少 origin 的记录计入 errors[0]"""
+    for record in records:
+        origin = record.get("origin") or record.get("unified_msg_origin")
+        if not origin:
+            errors[0] += 1
+            continue
+        parts = origin.split(":", 2)
+        message_type = record.get("message_type") or (parts[1] if len(parts) == 3 else "OtherMessage")
+        if message_type not in ("FriendMessage", "GroupMessage", "OtherMessage"):
+            errors[0] += 1
+            continue
+        raw = record.get("raw")
+        if raw is None and ("post_type" in record or "sub_type" in record):
+            raw = {"post_type": record.get("post_type", "message"),
+                   "message_type": _RAW_MESSAGE_TYPES.get(message_type, ""),
+                   "sub_type": record.get("sub_type", "")}
+        timestamp = record.get("time")
+        event = StubEvent(
+            origin,
+            str(record.get("sender") or record.get("sender_id") or ""),
+            str(record.get("group") or record.get("group_id") or ""),
+            message_type=message_type,
+            raw_message=raw,
+            platform_name=record.get("platform") or parts[0],
+            timestamp=timestamp,
+            message_str="",
+        )
+        yield event, timestamp
+
+
+class Replayer:
+    """用一组配置驱动插件，按 (结果, 类别) 和消息类型计数
+
+    回放时按记录中的时间戳推进刷屏保护的时钟，使其时间窗口与录制时一致
+    """
+
+    def __init__(self, config: dict, platforms):
+        self.plugin = make_plugin({**config, **REPLAY_OVERRIDES}, platforms=platforms)
+        self.plugin._flood_guard.clock = self._clock
+        self.now = None
+        self.events = {}
+        self.decisions = {}
+
+    def _clock(self):
+        return self.now if self.now is not None else time.monotonic()
+
+    def decide(self, event, timestamp) -> tuple:
+        """返回 (ALLOWED / BLOCKED, 类别)"""
+        if timestamp is not None:
+            self.now = float(timestamp)
+        event.reset()
+        outcome = self.plugin.filter_event(event)
+        decisions = self.decisions
+        decisions[outcome] = decisions.get(outcome, 0) + 1
+        message_type = event.get_message_type().value
+        self.events[message_type] = self.events.get(message_type, 0) + 1
+        return outcome
+
+    def summary(self) -> dict:
+        return {
+            "events": dict(self.events),
+            "decisions": [
+                {"result": result, "category": category, "count": count}
+                for (result, category), count in sorted(self.decisions.items())
+            ],
+            "shed": self.plugin._flood_guard.shed,
+        }
+
+
+def replay(events, replayers: list, transitions: dict, progress: bool) -> int:
+    """回放所有事件，返回事件数。有两组配置时统计判定发生变化的事件"""
+    count = 0
+    if len(replayers) == 1:
+        decide = replayers[0].decide
+        for event, timestamp in events:
+            decide(event, timestamp)
+            count += 1
+            if progress and count % PROGRESS_EVERY == 0:
+                print(f"已回放 {count:,} 条事件", file=sys.stderr)
+        return count
+    baseline, candidate = replayers
+    for event, timestamp in events:
+        before = baseline.decide(event, timestamp)
+        after = candidate.decide(event, timestamp)
+        if before != after:
+            key = (before, after)
+            transitions[key] = transitions.get(key, 0) + 1
+        count += 1
+        if progress and count % PROGRESS_EVERY == 0:
+            print(f"已回放 {count:,} 条事件", file=sys.stderr)
+    return count
+
+
+def print_decisions(title: str, summary: dict, total: int):
+    print(f"【{title}】")
+    for decision in summary["decisions"]:
+        share = decision["count"] / total * 100 if total else 0.0
+        label = "放行" if decision["result"] == "allowed" else "阻止"
+        print(f"  {label} {decision['category']:<10} {decision['count']:>12,} ({share:5.1f}%)")
+    blocked = sum(d["count"] for d in summary["decisions"] if d["result"] == "blocked")
+    print(f"  阻止合计 {blocked:,} / {total:,} ({blocked / total * 100 if total else 0.0:.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放录制的事件日志，统计白名单策略的放行/阻止结果")
+    parser.add_argument("paths", nargs="+", help="JSONL 事件日志（支持 .gz，- 表示标准输入）")
+    parser.add_argument("--config", help="插件配置文件（JSON），如 data/config/astrbot_plugin_whitelistpro_config.json")
+    parser.add_argument("--set", dest="overrides", action="append", type=parse_override, default=[],
+                        metavar="KEY=VALUE", help="覆盖配置项，值按 JSON 解析，可重复")
+    parser.add_argument("--compare", action="store_true",
+                        help="同时回放未应用 --set 的配置，统计判定发生变化的事件")
+    parser.add_argument("--platforms", default="",
+                        help="已启用的平台ID，逗号分隔；省略时使用配置中的 platform_ids")
+    parser.add_argument("--json", help="将结果以 JSON 格式写入该文件")
+    parser.add_argument("--progress", action="store_true", help=f"每 {PROGRESS_EVERY:,} 条事件输出一次进度")
+    args = parser.parse_args()
+
+    logging.getLogger("astrbot").setLevel(logging.WARNING)
+    platforms = tuple(p.strip() for p in args.platforms.split(",") if p.strip())
+    overrides = dict(args.overrides)
+    if args.compare and not overrides:
+        parser.error("--compare 需要至少一个 --set")
+
+    with tempfile.TemporaryDirectory(prefix="awb_replay_") as data_dir:
+        # 插件数据目录指向临时目录，回放不会读写真实的数据文件
+        StarTools.data_dir = data_dir
+        replayers = []
+        if args.compare:
+            replayers.append(Replayer(load_config(args.config, {}), platforms))
+        replayers.append(Replayer(load_config(args.config, overrides), platforms))
+
+        errors = [0]
+        transitions = {}
+        start = time.perf_counter()
+        count = replay(build_events(parse_records(read_lines(args.paths), errors), errors),
+                       replayers, transitions, args.progress)
+        elapsed = time.perf_counter() - start
+        summaries = [replayer.summary() for replayer in replayers]
+
+    print(f"回放 {count:,} 条事件，跳过无效记录 {errors[0]:,} 条，耗时 {elapsed:.2f} 秒，"
+          f"{count / elapsed if elapsed else 0:,.0f} events/s"
+          + ("（两组配置）" if args.compare else ""))
+    titles = ("当前配置", "修改后") if args.compare else ("判定结果",)
+    for title, summary in zip(titles, summaries):
+        print_decisions(title, summary, count)
+    if transitions:
+        print("【判定变化】")
+        for (before, after), n in sorted(transitions.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"  {before[0]}/{before[1]} -> {after[0]}/{after[1]}: {n:,}")
+
+    if args.json:
+        result = {
+            "events": count,
+            "invalid": errors[0],
+            "seconds": elapsed,
+            "events_per_sec": count / elapsed if elapsed else 0,
+            "results": dict(zip(titles, summaries)),
+            "transitions": [
+                {"before": list(before), "after": list(after), "count": n}
+                for (before, after), n in transitions.items()
+            ],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()